@@ -0,0 +1,132 @@
+"""
+Bakes the anatomical region atlas used by the compute shader, the routine
+player and the stimulus buttons.
+
+Outputs (served by Vite from public/):
+    public/atlas/region_atlas.json  - region table: names, stimulus anchors, physics
+    public/atlas/region_atlas.bin   - one uint8 region ID per voxel (z-major, like
+                                      the tensor buffer), read on the GPU as packed u32
+
+Regions are classified once here instead of per invocation in WGSL, so the
+shader does a single table lookup and new regions cost nothing per frame.
+To add a region, append it to REGIONS (first match wins; id 0 is the
+fallback) and re-run:
+    python bake_region_atlas.py
+"""
+import argparse
+import json
+import os
+import struct
+from array import array
+
+VOXEL_DIM = 32      # Must match BrainRenderer.voxelDim / VOXEL_DIM in shaders.js
+BRAIN_RANGE = 1.6   # Must match BRAIN_RANGE in shaders.js
+OUTPUT_DIRECTORY = "public/atlas"
+
+# Order matters: the first matching region claims a voxel.
+# `anchor` is the stimulus target used by routines and the UI buttons.
+REGIONS = [
+    {   # Deep Structures: everything not claimed by a lobe
+        "name": "deep", "anchor": [0.0, 0.0, 0.0],
+        "decay": 0.96, "diffusion": 0.1, "flowBias": 0.0,
+        "contains": lambda x, y, z: True,
+    },
+    {   # Frontal Lobe: hyper-retention for deep thought, drifts towards Occipital
+        "name": "frontal", "anchor": [0.0, 0.0, 1.2],
+        "decay": 0.998, "diffusion": 0.15, "flowBias": -1.0,
+        "contains": lambda x, y, z: z > 0.5,
+    },
+    {   # Occipital Lobe: fast processing, visual inputs
+        "name": "occipital", "anchor": [0.0, 0.0, -1.2],
+        "decay": 0.92, "diffusion": 0.04, "flowBias": 0.0,
+        "contains": lambda x, y, z: z < -0.5,
+    },
+    {   # Temporal Lobe: auditory/memory
+        "name": "temporal", "anchor": [1.0, 0.0, 0.0],
+        "decay": 0.95, "diffusion": 0.1, "flowBias": 0.0,
+        "contains": lambda x, y, z: abs(x) > 0.8,
+    },
+    {   # Parietal Lobe: sensory integration
+        "name": "parietal", "anchor": [0.0, 1.0, 0.0],
+        "decay": 0.94, "diffusion": 0.12, "flowBias": 0.0,
+        "contains": lambda x, y, z: y > 0.6,
+    },
+]
+
+
+def f32(value):
+    """Rounds to float32 so voxel centres match the shader's arithmetic exactly."""
+    return struct.unpack("<f", struct.pack("<f", value))[0]
+
+
+def voxel_world_position(i, dim):
+    # Mirrors computeShader: (f32(i) / f32(dim) * 2.0 - 1.0) * BRAIN_RANGE
+    return f32(f32(f32(f32(i) / dim) * 2.0 - 1.0) * f32(BRAIN_RANGE))
+
+
+def classify(x, y, z):
+    # Lobes are tested in table order after the fallback
+    for region_id, region in enumerate(REGIONS[1:], start=1):
+        if region["contains"](x, y, z):
+            return region_id
+    return 0
+
+
+def bake(dim=VOXEL_DIM):
+    """Returns a z-major uint8 array of region IDs."""
+    if len(REGIONS) > 256:
+        raise ValueError("Region IDs are stored as uint8 (max 256 regions)")
+    coords = [voxel_world_position(i, dim) for i in range(dim)]
+    voxels = array("B", bytes(dim * dim * dim))
+    index = 0
+    for z in coords:
+        for y in coords:
+            for x in coords:
+                voxels[index] = classify(x, y, z)
+                index += 1
+    return voxels
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake the voxel region atlas.")
+    parser.add_argument("--out", default=OUTPUT_DIRECTORY)
+    args = parser.parse_args()
+
+    voxels = bake()
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "region_atlas.bin"), "wb") as f:
+        voxels.tofile(f)
+
+    counts = [0] * len(REGIONS)
+    for region_id in voxels:
+        counts[region_id] += 1
+
+    meta = {
+        "version": 1,
+        "voxelDim": VOXEL_DIM,
+        "brainRange": BRAIN_RANGE,
+        "voxels": "region_atlas.bin",
+        "regions": [
+            {
+                "id": region_id,
+                "name": region["name"],
+                "anchor": region["anchor"],
+                "decay": region["decay"],
+                "diffusion": region["diffusion"],
+                "flowBias": region["flowBias"],
+                "voxelCount": counts[region_id],
+            }
+            for region_id, region in enumerate(REGIONS)
+        ],
+    }
+    with open(os.path.join(args.out, "region_atlas.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+        f.write("\n")
+
+    for region in meta["regions"]:
+        print(f"  {region['id']:3d} {region['name']:<10} {region['voxelCount']:6d} voxels")
+    print(f"✅ Atlas written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 // brain-renderer.js
 // Verified Neuro-Weaver V2.6 Implementation
 import { BrainGeometry } from './brain-geometry.js';
-import { vertexShader, fragmentShader, computeShader, somaVertexShader, somaFragmentShader } from './shaders.js';
+import { vertexShader, fragmentShader, computeShader, somaVertexShader, somaFragmentShader, cullShader } from './shaders.js';
 import { Mat4 } from './math-utils.js';
 
 export class BrainRenderer {
@@ -14,13 +14,21 @@ export class BrainRenderer {
         this.pipeline = null;      // Solid Mesh
         this.fiberPipeline = null; // Lines
         this.somaPipeline = null;  // Instanced Spheres (Somas) [Renamed for V2.6]
+        this.fiberCullPipeline = null; // Lines from the GPU-culled (compacted) buffer
+
+        // [GPU Culling] Filter somas/fibers against slice plane + frustum, draw indirect
+        this.gpuCulling = true;
         
         this.rotation = { x: 0, y: 0 };
         this.targetRotation = { x: 0.3, y: 0 };
         this.zoom = 3.5;
         this.targetZoom = 3.5; // [Neuro-Weaver] Smooth Zoom Target
         this.time = 0;
+        this.timeStep = 0.016; // Simulation seconds per rendered frame
+        this.fastForward = false; // [Batch] Advance the simulation without rasterizing
+        this.drawSomas = true; // Circuit-grid somas; off once dataset fibers replace the grid
         this.isRunning = false;
+        this.firstFrameDone = false;
         
         this.params = {
             frequency: 2.0,
@@ -37,6 +45,8 @@ export class BrainRenderer {
         // 32x32x32 flattened buffer
         this.voxelDim = 32;
         this.voxelCount = this.voxelDim * this.voxelDim * this.voxelDim;
+        // When true the tensor is streamed in (DatasetPlayer) and the physics pass is skipped
+        this.externalActivity = false;
 
         // Stimulus State (V2.2 Initialized)
         // Stores position and intensity for compute shader injection
@@ -79,7 +89,11 @@ export class BrainRenderer {
         }
     }
 
-    async initialize() {
+    async initialize(regionAtlas) {
+        if (regionAtlas.voxelDim !== this.voxelDim) {
+            throw new Error(`Region atlas is ${regionAtlas.voxelDim}^3 but the tensor grid is ${this.voxelDim}^3`);
+        }
+
         const adapter = await navigator.gpu.requestAdapter();
         if (!adapter) throw new Error('No GPU');
         
@@ -95,7 +109,12 @@ export class BrainRenderer {
             }
         }
         
-        this.device = await adapter.requestDevice({ requiredFeatures });
+        // Imported datasets can need far larger fiber buffers than the defaults allow
+        const requiredLimits = {
+            maxBufferSize: adapter.limits.maxBufferSize,
+            maxStorageBufferBindingSize: adapter.limits.maxStorageBufferBindingSize
+        };
+        this.device = await adapter.requestDevice({ requiredFeatures, requiredLimits });
         this.context = this.canvas.getContext('webgpu');
         const format = navigator.gpu.getPreferredCanvasFormat();
         this.context.configure({ device: this.device, format: format, alphaMode: 'opaque' });
@@ -110,13 +129,13 @@ export class BrainRenderer {
         this.indexBuffer = this.createBuffer(geometry.getIndexData(), GPUBufferUsage.INDEX);
         this.indexCount = geometry.getIndexCount();
         
-        // 2. Fiber Line Buffers
-        this.fiberBuffer = this.createBuffer(geometry.getFiberData(), GPUBufferUsage.VERTEX);
+        // 2. Fiber Line Buffers (STORAGE: read by the culling pass)
+        this.fiberBuffer = this.createBuffer(geometry.getFiberData(), GPUBufferUsage.VERTEX | GPUBufferUsage.STORAGE);
         this.fiberVertexCount = geometry.getFiberVertexCount();
         
         // 3. Setup Resource Groups
         this.initSomaResources(geometry);
-        this.initVolumetricResources();
+        this.initVolumetricResources(regionAtlas);
         
         // Bind Groups Layouts
         const renderBindGroupLayout = this.device.createBindGroupLayout({
@@ -177,8 +196,32 @@ export class BrainRenderer {
             depthStencil: { depthWriteEnabled: false, depthCompare: 'less', format: 'depth24plus' } 
         });
 
+        // --- PIPELINE 2b: CULLED FIBERS ---
+        // Compacted vec4(position, sourceIndex) vertices written by the culling pass
+        this.fiberCullPipeline = this.device.createRenderPipeline({
+            layout: this.device.createPipelineLayout({ bindGroupLayouts: [renderBindGroupLayout] }),
+            vertex: {
+                module: this.device.createShaderModule({ code: vertexShader }),
+                entryPoint: 'main_fiber',
+                buffers: [
+                    { arrayStride: 16, attributes: [
+                        { shaderLocation: 0, offset: 0, format: 'float32x3' },  // Pos
+                        { shaderLocation: 1, offset: 12, format: 'uint32' }     // Source vertex index (bitcast)
+                    ] }
+                ]
+            },
+            fragment: {
+                module: this.device.createShaderModule({ code: fragmentShader }),
+                entryPoint: 'main',
+                targets: [{ format: format, blend: { color: { srcFactor: 'src-alpha', dstFactor: 'one', operation: 'add' }, alpha: { srcFactor: 'one', dstFactor: 'one', operation: 'add' } } }]
+            },
+            primitive: { topology: 'line-list' },
+            depthStencil: { depthWriteEnabled: false, depthCompare: 'less', format: 'depth24plus' }
+        });
+
         this.initSomaPipeline(renderBindGroupLayout, format);
         this.initComputePipeline();
+        this.initCullingResources();
 
         // Ensure canvas dimensions are valid before creating depth texture
         const width = Math.max(1, this.canvas.width);
@@ -189,7 +232,7 @@ export class BrainRenderer {
     }
 
     // [Neuro-Weaver] Refactored: Initialize Volumetric Data (Tensor)
-    initVolumetricResources() {
+    initVolumetricResources(regionAtlas) {
         // VOXEL DATA
         // [Neuro-Weaver] 3D Texture Evolution: Flattened storage buffer for volumetric data
         this.voxelBufferSize = this.voxelCount;
@@ -200,6 +243,10 @@ export class BrainRenderer {
             usage: GPUBufferUsage.STORAGE | GPUBufferUsage.COPY_DST
         });
 
+        // [Region Atlas] Per-voxel region IDs (packed uint8) and per-region physics table
+        this.regionAtlasBuffer = this.createBuffer(regionAtlas.voxelWords, GPUBufferUsage.STORAGE);
+        this.regionPhysicsBuffer = this.createBuffer(regionAtlas.getPhysicsData(), GPUBufferUsage.STORAGE);
+
         // Uniforms (Size increased for ClipPlane)
         // 48 floats (192 bytes)
         // Layout:
@@ -221,7 +268,7 @@ export class BrainRenderer {
         // 3. Soma (Sphere) Instancing (V2.2)
         // [Neuro-Weaver] Use explicit grid intersections from geometry for instance positions
         const somaPositions = geometry.getSomaPositions();
-        this.somaInstanceBuffer = this.createBuffer(somaPositions, GPUBufferUsage.VERTEX);
+        this.somaInstanceBuffer = this.createBuffer(somaPositions, GPUBufferUsage.VERTEX | GPUBufferUsage.STORAGE);
         this.somaInstanceCount = somaPositions.length / 3;
 
         // Create a simple low-poly sphere (Icosahedron) for the instance geometry
@@ -286,11 +333,14 @@ export class BrainRenderer {
         // Compute Pipeline
         const computeLayout = this.device.createBindGroupLayout({
              entries: [{ binding: 0, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'storage' } },
-                       { binding: 1, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'uniform' } }]
+                       { binding: 1, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'uniform' } },
+                       { binding: 2, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'read-only-storage' } },
+                       { binding: 3, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'read-only-storage' } }]
         });
         this.computeBindGroup = this.device.createBindGroup({
             layout: computeLayout,
-            entries: [{ binding: 0, resource: { buffer: this.tensorBuffer } }, { binding: 1, resource: { buffer: this.computeUniformBuffer } }]
+            entries: [{ binding: 0, resource: { buffer: this.tensorBuffer } }, { binding: 1, resource: { buffer: this.computeUniformBuffer } },
+                      { binding: 2, resource: { buffer: this.regionAtlasBuffer } }, { binding: 3, resource: { buffer: this.regionPhysicsBuffer } }]
         });
         this.computePipeline = this.device.createComputePipeline({
             layout: this.device.createPipelineLayout({ bindGroupLayouts: [computeLayout] }),
@@ -298,6 +348,125 @@ export class BrainRenderer {
         });
     }
 
+    // [GPU Culling] Compute pass that compacts visible somas/fiber segments
+    // and fills the indirect draw arguments consumed by the Connectome draws.
+    initCullingResources() {
+        const cullLayout = this.device.createBindGroupLayout({
+            entries: [
+                { binding: 0, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'uniform' } },
+                { binding: 1, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'read-only-storage' } },
+                { binding: 2, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'storage' } },
+                { binding: 3, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'read-only-storage' } },
+                { binding: 4, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'storage' } },
+                { binding: 5, visibility: GPUShaderStage.COMPUTE, buffer: { type: 'storage' } }
+            ]
+        });
+        const layout = this.device.createPipelineLayout({ bindGroupLayouts: [cullLayout] });
+        const module = this.device.createShaderModule({ code: cullShader });
+        this.cullSomaPipeline = this.device.createComputePipeline({ layout, compute: { module, entryPoint: 'cull_somas' } });
+        this.cullFiberPipeline = this.device.createComputePipeline({ layout, compute: { module, entryPoint: 'cull_fibers' } });
+        this.cullBindGroupLayout = cullLayout;
+
+        // Indirect args (12 x u32): soma drawIndexedIndirect at 0, fiber drawIndirect at 32 bytes
+        this.drawArgsBuffer = this.device.createBuffer({
+            size: 48,
+            usage: GPUBufferUsage.STORAGE | GPUBufferUsage.INDIRECT | GPUBufferUsage.COPY_DST | GPUBufferUsage.COPY_SRC
+        });
+        this.fiberArgsOffset = 32;
+
+        this.somaCullBuffer = this.device.createBuffer({
+            size: this.somaInstanceBuffer.size,
+            usage: GPUBufferUsage.VERTEX | GPUBufferUsage.STORAGE
+        });
+        this.createFiberCullResources();
+    }
+
+    // Sized from the current fiberBuffer; call again whenever fibers are replaced
+    createFiberCullResources() {
+        if (this.fiberCullBuffer) this.fiberCullBuffer.destroy();
+        this.fiberCullBuffer = null;
+        this.cullBindGroup = null;
+
+        // vec4 per vertex (xyz + source index); both fiber buffers are bound as storage
+        const limits = this.device.limits;
+        const cullBytes = this.fiberVertexCount * 16;
+        // Leaves cullBindGroup null rather than clearing gpuCulling, so culling resumes
+        // on its own once a smaller fiber set is loaded
+        if (cullBytes > limits.maxStorageBufferBindingSize || cullBytes > limits.maxBufferSize) {
+            console.warn(`[GPU Culling] ${this.fiberVertexCount} fiber vertices exceed device buffer limits; drawing without culling`);
+            return;
+        }
+
+        this.fiberCullBuffer = this.device.createBuffer({
+            size: Math.max(16, this.fiberVertexCount * 16),
+            usage: GPUBufferUsage.VERTEX | GPUBufferUsage.STORAGE
+        });
+
+        // Reset values written before every cull: instance/vertex counts start at 0
+        this.drawArgsReset = new Uint32Array([
+            this.somaIndexCount, 0, 0, 0, 0, 0, 0, 0,
+            0, 1, 0, 0
+        ]);
+
+        this.cullBindGroup = this.device.createBindGroup({
+            layout: this.cullBindGroupLayout,
+            entries: [
+                { binding: 0, resource: { buffer: this.uniformBuffer } },
+                { binding: 1, resource: { buffer: this.somaInstanceBuffer } },
+                { binding: 2, resource: { buffer: this.somaCullBuffer } },
+                { binding: 3, resource: { buffer: this.fiberBuffer } },
+                { binding: 4, resource: { buffer: this.fiberCullBuffer } },
+                { binding: 5, resource: { buffer: this.drawArgsBuffer } }
+            ]
+        });
+    }
+
+    // [GPU Culling] Reads back the last frame's draw arguments.
+    // Stalls on the GPU; intended for benchmarks and debugging only.
+    async readCullStats() {
+        const readback = this.device.createBuffer({ size: 48, usage: GPUBufferUsage.MAP_READ | GPUBufferUsage.COPY_DST });
+        const encoder = this.device.createCommandEncoder();
+        encoder.copyBufferToBuffer(this.drawArgsBuffer, 0, readback, 0, 48);
+        this.device.queue.submit([encoder.finish()]);
+
+        await readback.mapAsync(GPUMapMode.READ);
+        const args = new Uint32Array(readback.getMappedRange().slice(0));
+        readback.unmap();
+        readback.destroy();
+
+        return {
+            somas: args[1],
+            somaTotal: this.somaInstanceCount,
+            fiberSegments: args[8] / 2,
+            fiberSegmentTotal: this.fiberVertexCount / 2
+        };
+    }
+
+    // One invocation per item with @workgroup_size(64), folded into 2D once the
+    // workgroup count passes maxComputeWorkgroupsPerDimension (see linearIndex)
+    dispatchLinear(pass, invocations) {
+        const groups = Math.ceil(invocations / 64);
+        if (groups === 0) return;
+        const x = Math.min(groups, this.device.limits.maxComputeWorkgroupsPerDimension);
+        pass.dispatchWorkgroups(x, Math.ceil(groups / x));
+    }
+
+    // [Dataset] Replaces the synthetic circuit grid with imported fibers (line-list xyz)
+    setFiberData(fiberData) {
+        if (fiberData.length === 0 || fiberData.length % 6 !== 0) {
+            throw new Error(`Fiber data must be non-empty xyz vertex pairs (got ${fiberData.length} floats)`);
+        }
+        if (fiberData.byteLength > this.device.limits.maxBufferSize) {
+            throw new Error(`Fiber data is ${fiberData.byteLength} bytes, above this GPU's maxBufferSize (${this.device.limits.maxBufferSize})`);
+        }
+        this.fiberBuffer.destroy();
+        this.fiberBuffer = this.createBuffer(fiberData, GPUBufferUsage.VERTEX | GPUBufferUsage.STORAGE);
+        this.fiberVertexCount = fiberData.length / 3;
+        // Somas sit on the synthetic grid intersections and do not match real streamlines
+        this.drawSomas = false;
+        this.createFiberCullResources();
+    }
+
     createBuffer(data, usage) {
         const buffer = this.device.createBuffer({ size: data.byteLength, usage: usage | GPUBufferUsage.COPY_DST });
         this.device.queue.writeBuffer(buffer, 0, data);
@@ -429,16 +598,41 @@ export class BrainRenderer {
             this.depthTexture = this.device.createTexture({ size: [width, height], format: 'depth24plus', usage: GPUTextureUsage.RENDER_ATTACHMENT });
         }
 
-        this.time += 0.016;
+        this.time += this.timeStep;
         this.updateUniforms();
         
         const commandEncoder = this.device.createCommandEncoder();
         
-        const computePass = commandEncoder.beginComputePass();
-        computePass.setPipeline(this.computePipeline);
-        computePass.setBindGroup(0, this.computeBindGroup);
-        computePass.dispatchWorkgroups(Math.ceil(this.voxelBufferSize / 64));
-        computePass.end();
+        if (!this.externalActivity) {
+            const computePass = commandEncoder.beginComputePass();
+            computePass.setPipeline(this.computePipeline);
+            computePass.setBindGroup(0, this.computeBindGroup);
+            computePass.dispatchWorkgroups(Math.ceil(this.voxelBufferSize / 64));
+            computePass.end();
+        }
+
+        if (this.fastForward) {
+            // [Batch] Physics and camera smoothing only; nothing is drawn or presented
+            this.device.queue.submit([commandEncoder.finish()]);
+            requestAnimationFrame(() => this.render());
+            return;
+        }
+
+        const isConnectome = this.params.style >= 2.0 && this.params.style < 3.0;
+        const useCulling = isConnectome && this.gpuCulling && this.cullBindGroup !== null;
+        if (useCulling) {
+            // [GPU Culling] Compact visible somas/fiber segments for the indirect draws below
+            this.device.queue.writeBuffer(this.drawArgsBuffer, 0, this.drawArgsReset);
+            const cullPass = commandEncoder.beginComputePass();
+            cullPass.setBindGroup(0, this.cullBindGroup);
+            if (this.drawSomas) {
+                cullPass.setPipeline(this.cullSomaPipeline);
+                this.dispatchLinear(cullPass, this.somaInstanceCount);
+            }
+            cullPass.setPipeline(this.cullFiberPipeline);
+            this.dispatchLinear(cullPass, this.fiberVertexCount / 2);
+            cullPass.end();
+        }
         
         const renderPass = commandEncoder.beginRenderPass({
             colorAttachments: [{
@@ -451,22 +645,36 @@ export class BrainRenderer {
         
         renderPass.setBindGroup(0, this.bindGroup);
         
-        if (this.params.style >= 2.0 && this.params.style < 3.0) {
+        if (isConnectome) {
             // --- CONNECTOME MODE ---
 
             // 1. Draw Fibers
-            renderPass.setPipeline(this.fiberPipeline);
-            renderPass.setVertexBuffer(0, this.fiberBuffer);
-            renderPass.setVertexBuffer(1, this.fiberBuffer); 
-            renderPass.draw(this.fiberVertexCount); 
+            if (useCulling) {
+                renderPass.setPipeline(this.fiberCullPipeline);
+                renderPass.setVertexBuffer(0, this.fiberCullBuffer);
+                renderPass.drawIndirect(this.drawArgsBuffer, this.fiberArgsOffset);
+            } else {
+                renderPass.setPipeline(this.fiberPipeline);
+                renderPass.setVertexBuffer(0, this.fiberBuffer);
+                renderPass.setVertexBuffer(1, this.fiberBuffer); 
+                renderPass.draw(this.fiberVertexCount); 
+            }
 
             // 2. Draw Instanced Neurons (Somas) [V2.6 Pipeline]
-            renderPass.setPipeline(this.somaPipeline);
-            renderPass.setVertexBuffer(0, this.somaVertexBuffer); // Mesh
-            renderPass.setVertexBuffer(1, this.somaInstanceBuffer); // Positions
-            renderPass.setIndexBuffer(this.somaIndexBuffer, 'uint16');
-            // Draw call uses instance count
-            renderPass.drawIndexed(this.somaIndexCount, this.somaInstanceCount);
+            if (this.drawSomas) {
+                renderPass.setPipeline(this.somaPipeline);
+                renderPass.setVertexBuffer(0, this.somaVertexBuffer); // Mesh
+                renderPass.setIndexBuffer(this.somaIndexBuffer, 'uint16');
+                if (useCulling) {
+                    // Instance count comes from the culling pass
+                    renderPass.setVertexBuffer(1, this.somaCullBuffer); // Visible positions
+                    renderPass.drawIndexedIndirect(this.drawArgsBuffer, 0);
+                } else {
+                    renderPass.setVertexBuffer(1, this.somaInstanceBuffer); // Positions
+                    // Draw call uses instance count
+                    renderPass.drawIndexed(this.somaIndexCount, this.somaInstanceCount);
+                }
+            }
 
         } else {
             renderPass.setPipeline(this.pipeline);
@@ -478,6 +686,11 @@ export class BrainRenderer {
         
         renderPass.end();
         this.device.queue.submit([commandEncoder.finish()]);
+        if (!this.firstFrameDone) {
+            // [Startup] Time-to-first-frame marker read by verification/bundle_budget.py
+            this.firstFrameDone = true;
+            this.device.queue.onSubmittedWorkDone().then(() => performance.mark('neuroweaver:first-frame'));
+        }
         requestAnimationFrame(() => this.render());
     }
 
@@ -0,0 +1,373 @@
+"""
+Converts real tractography and 4D activity volumes into chunked binary files
+the renderer streams at runtime (see dataset-player.js).
+
+Inputs:
+    --streamlines  .trk (TrackVis), .tck (MRtrix) or .npz with `points` (N, 3)
+                   and `lengths` (M,) arrays
+    --activity     .nii / .nii.gz (needs nibabel) or .npy shaped (X, Y, Z, T)
+
+Outputs (default public/datasets/<name>/):
+    manifest.json        - voxel grid, frame rate, chunk table, fiber info
+    fibers.bin           - float32 line-list vertices (x, y, z) in renderer space
+    activity_NNNN.bin    - float32 frames of VOXEL_DIM^3 values in [0, 1],
+                           z-major like tensorBuffer, `--chunk-frames` per file
+
+Large inputs are processed out-of-core: .trk/.tck/.npy are memory-mapped and
+NIfTI data is sliced through nibabel's array proxy, so only one chunk of
+frames (or one block of streamline points) is resident at a time.
+
+Coordinates are RAS (millimetres when an affine is available) and map to the
+renderer as x = Left (-R), y = Superior, z = Anterior, centred and scaled to
+fit the brain mesh. R is negated because swapping A and S alone would mirror
+the brain; with it the mapping is a rotation and both spaces stay right-handed. When both inputs are given they share one transform, derived
+from the activity volume's bounds, and the conversion stops if the streamlines
+fall far outside that volume. .npy volumes carry no affine: pass --voxel-size
+or --affine to place them in the streamlines' space (default: voxel indices).
+
+Usage:
+    python convert_dataset.py --streamlines tracts.trk --activity bold.nii.gz --name subject01
+    python convert_dataset.py --streamlines tracts.tck --activity bold.npy --voxel-size 2 2 2
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+
+VOXEL_DIM = 32          # Must match BrainRenderer.voxelDim
+BRAIN_RANGE = 1.6       # Must match BRAIN_RANGE in shaders.js (tensor grid half-size)
+FIT_EXTENT = 1.4        # Half-size the data is scaled to (brain mesh radius is ~1.5)
+POINT_BLOCK = 1 << 20   # Points per memory-mapped block when scanning .tck files
+REGISTRATION_SLACK = 0.25  # Streamlines may overhang the volume by this share of its extent
+
+
+# --- Coordinate mapping ---
+
+class RendererTransform:
+    """Maps RAS coordinates into renderer space (x = -R, y = S, z = A)."""
+
+    def __init__(self, ras_min, ras_max):
+        ras_min = np.asarray(ras_min, dtype=np.float64)
+        ras_max = np.asarray(ras_max, dtype=np.float64)
+        self.center = (ras_min + ras_max) / 2.0
+        half_extent = max(float(np.max(ras_max - ras_min)) / 2.0, 1e-6)
+        self.scale = FIT_EXTENT / half_extent
+
+    def apply(self, ras):
+        p = (np.asarray(ras, dtype=np.float64) - self.center) * self.scale
+        return np.stack([-p[..., 0], p[..., 2], p[..., 1]], axis=-1)
+
+    def to_json(self):
+        return {"center": self.center.tolist(), "scale": self.scale}
+
+
+# --- Streamlines ---
+
+def _read_trk(path):
+    """Yields (n, 3) RAS streamlines from a TrackVis file via a memory map."""
+    header = np.fromfile(path, dtype=np.uint8, count=1000).tobytes()
+    endian = "<" if np.frombuffer(header[996:1000], "<i4")[0] == 1000 else ">"
+    voxel_size = np.frombuffer(header[12:24], endian + "f4").astype(np.float64)
+    n_scalars = int(np.frombuffer(header[36:38], endian + "i2")[0])
+    n_properties = int(np.frombuffer(header[238:240], endian + "i2")[0])
+    vox_to_ras = np.frombuffer(header[440:504], endian + "f4").reshape(4, 4).astype(np.float64)
+    if not vox_to_ras.any():
+        vox_to_ras = np.diag([1.0, 1.0, 1.0, 1.0])
+    voxel_size[voxel_size == 0] = 1.0
+
+    data = np.memmap(path, dtype=endian + "f4", mode="r", offset=1000)
+    counts = data.view(endian + "i4")
+    stride = 3 + n_scalars
+    pos = 0
+    while pos < len(data):
+        n = int(counts[pos])
+        pos += 1
+        block = np.asarray(data[pos:pos + n * stride]).reshape(n, stride)[:, :3].astype(np.float64)
+        pos += n * stride + n_properties
+        # Points are in "voxmm" (voxel corner origin); convert to voxel centres, then RAS
+        vox = block / voxel_size - 0.5
+        yield vox @ vox_to_ras[:3, :3].T + vox_to_ras[:3, 3]
+
+
+def _read_tck(path):
+    """Yields (n, 3) streamlines from an MRtrix .tck file, scanning in blocks."""
+    offset = None
+    dtype = "<f4"
+    with open(path, "rb") as f:
+        for raw in f:
+            line = raw.decode("latin-1").strip()
+            if line == "END":
+                break
+            key, _, value = line.partition(":")
+            if key == "file":
+                offset = int(value.split()[1])
+            elif key == "datatype":
+                dtype = ">f4" if value.strip().endswith("BE") else "<f4"
+    if offset is None:
+        raise ValueError(f"{path}: missing 'file:' entry in .tck header")
+
+    points = np.memmap(path, dtype=dtype, mode="r", offset=offset)
+    points = points[:len(points) - len(points) % 3].reshape(-1, 3)
+    pending = []
+    for start in range(0, len(points), POINT_BLOCK):
+        block = np.asarray(points[start:start + POINT_BLOCK], dtype=np.float64)
+        # NaN rows separate streamlines, an Inf row terminates the file
+        breaks = np.flatnonzero(~np.isfinite(block[:, 0]))
+        begin = 0
+        for b in breaks:
+            pending.append(block[begin:b])
+            streamline = np.concatenate(pending)
+            pending = []
+            if len(streamline):
+                yield streamline
+            if np.isinf(block[b, 0]):
+                return
+            begin = b + 1
+        pending.append(block[begin:])
+
+
+def _read_npz(path):
+    """Yields streamlines from an .npz with `points` and `lengths` (loaded whole)."""
+    archive = np.load(path)
+    points = archive["points"]
+    offsets = np.concatenate([[0], np.cumsum(archive["lengths"])])
+    for start, end in zip(offsets[:-1], offsets[1:]):
+        yield points[start:end].astype(np.float64)
+
+
+def iter_streamlines(path):
+    if path.endswith(".trk"):
+        return _read_trk(path)
+    if path.endswith(".tck"):
+        return _read_tck(path)
+    if path.endswith(".npz"):
+        return _read_npz(path)
+    raise ValueError(f"Unsupported streamline format: {path}")
+
+
+def resample_streamline(points, step, max_points):
+    """Resamples a polyline at a fixed arc-length step, then decimates to max_points."""
+    segment = np.linalg.norm(np.diff(points, axis=0), axis=1)
+    arc = np.concatenate([[0.0], np.cumsum(segment)])
+    total = arc[-1]
+    samples = np.append(np.arange(0.0, total, step), total) if total > step else np.array([0.0, total])
+    resampled = np.stack([np.interp(samples, arc, points[:, i]) for i in range(3)], axis=1)
+    if len(resampled) > max_points:
+        keep = np.linspace(0, len(resampled) - 1, max_points).round().astype(int)
+        resampled = resampled[keep]
+    return resampled
+
+
+def streamline_bounds(path, keep_every):
+    lo = np.full(3, np.inf)
+    hi = np.full(3, -np.inf)
+    for i, points in enumerate(iter_streamlines(path)):
+        if i % keep_every or len(points) < 2:
+            continue
+        lo = np.minimum(lo, points.min(axis=0))
+        hi = np.maximum(hi, points.max(axis=0))
+    if not np.isfinite(lo).all():
+        raise ValueError(f"{path}: no streamlines with at least two points")
+    return lo, hi
+
+
+def convert_streamlines(path, out_dir, transform, step, max_points, min_length, keep_every):
+    """Writes fibers.bin as a float32 line list; returns its manifest entry."""
+    vertex_count = 0
+    streamline_count = 0
+    with open(os.path.join(out_dir, "fibers.bin"), "wb") as f:
+        for i, points in enumerate(iter_streamlines(path)):
+            if i % keep_every or len(points) < 2:
+                continue
+            if np.linalg.norm(np.diff(points, axis=0), axis=1).sum() < min_length:
+                continue
+            resampled = transform.apply(resample_streamline(points, step, max_points))
+            # Line list: consecutive points become (a, b) vertex pairs
+            segments = np.stack([resampled[:-1], resampled[1:]], axis=1).astype("<f4")
+            segments.tofile(f)
+            vertex_count += len(segments) * 2
+            streamline_count += 1
+    print(f"🧵 {streamline_count} streamlines -> {vertex_count // 2} segments")
+    return {"file": "fibers.bin", "vertexCount": vertex_count, "streamlineCount": streamline_count}
+
+
+# --- Activity volumes ---
+
+def open_volume(path, npy_affine=None):
+    """
+    Returns (array-like (X, Y, Z, T), voxel->RAS affine, frame interval in seconds or None).
+    `npy_affine` places .npy volumes, which store no affine; without it voxel indices are used.
+    """
+    if path.endswith(".npy"):
+        data = np.load(path, mmap_mode="r")
+        return data, np.eye(4) if npy_affine is None else npy_affine, None
+    if path.endswith((".nii", ".nii.gz")):
+        try:
+            import nibabel
+        except ImportError:
+            raise SystemExit("❌ Reading NIfTI needs nibabel (pip install nibabel), or convert to .npy first")
+        image = nibabel.load(path)
+        zooms = image.header.get_zooms()
+        frame_interval = float(zooms[3]) if len(zooms) > 3 and zooms[3] > 0 else None
+        # dataobj is an array proxy: slicing reads only the requested frames
+        return image.dataobj, image.affine, frame_interval
+    raise ValueError(f"Unsupported volume format: {path}")
+
+
+def volume_bounds(shape, affine):
+    corners = np.array([[i, j, k] for i in (0, shape[0] - 1) for j in (0, shape[1] - 1) for k in (0, shape[2] - 1)], dtype=np.float64)
+    ras = corners @ affine[:3, :3].T + affine[:3, 3]
+    return ras.min(axis=0), ras.max(axis=0)
+
+
+def check_registration(fiber_bounds, activity_bounds):
+    """Stops the conversion when the streamlines are clearly not in the volume's space."""
+    f_lo, f_hi = fiber_bounds
+    v_lo, v_hi = activity_bounds
+    slack = (v_hi - v_lo) * REGISTRATION_SLACK
+    if np.any(f_lo < v_lo - slack) or np.any(f_hi > v_hi + slack):
+        raise SystemExit(
+            f"❌ Streamlines span {np.round(f_lo, 1).tolist()} - {np.round(f_hi, 1).tolist()} but the activity volume "
+            f"spans {np.round(v_lo, 1).tolist()} - {np.round(v_hi, 1).tolist()}; they are not in the same space.\n"
+            "   For .npy volumes pass --voxel-size or --affine so voxels map to the streamlines' coordinates."
+        )
+
+
+def voxel_labels(shape, affine, transform, dim):
+    """Target tensor index for every source voxel (C order), -1 if outside the grid."""
+    i, j, k = np.meshgrid(*(np.arange(n, dtype=np.float64) for n in shape[:3]), indexing="ij")
+    ras = np.stack([i, j, k], axis=-1).reshape(-1, 3) @ affine[:3, :3].T + affine[:3, 3]
+    # Same mapping as getVoxelValue in shaders.js
+    norm = transform.apply(ras) / BRAIN_RANGE * 0.5 + 0.5
+    cell = np.floor(norm * dim).astype(np.int64)
+    inside = np.all((cell >= 0) & (cell < dim), axis=1)
+    labels = cell[:, 2] * dim * dim + cell[:, 1] * dim + cell[:, 0]
+    labels[~inside] = -1
+    return labels
+
+
+class BlockAverager:
+    """Averages source voxels into tensor cells for a whole chunk of frames at once."""
+
+    def __init__(self, labels, dim):
+        valid = np.flatnonzero(labels >= 0)
+        self.order = valid[np.argsort(labels[valid], kind="stable")]
+        sorted_labels = labels[self.order]
+        self.cells, self.starts, counts = np.unique(sorted_labels, return_index=True, return_counts=True)
+        self.counts = counts[:, None].astype(np.float64)
+        self.size = dim ** 3
+
+    def __call__(self, chunk):
+        # chunk: (X, Y, Z, T) -> (T, dim^3)
+        flat = np.asarray(chunk, dtype=np.float64).reshape(-1, chunk.shape[-1])
+        sums = np.add.reduceat(flat[self.order], self.starts, axis=0)
+        out = np.zeros((self.size, chunk.shape[-1]), dtype=np.float64)
+        out[self.cells] = sums / self.counts
+        return out.T
+
+
+def convert_activity(path, out_dir, transform, dim, chunk_frames, fps, baseline, percentile, npy_affine=None):
+    """Writes chunked, normalized activity frames; returns the manifest entry."""
+    volume, affine, frame_interval = open_volume(path, npy_affine)
+    if len(volume.shape) != 4:
+        raise ValueError(f"{path}: expected a 4D (X, Y, Z, T) volume, got shape {volume.shape}")
+    frame_count = volume.shape[3]
+    average = BlockAverager(voxel_labels(volume.shape, affine, transform, dim), dim)
+    if fps is None:
+        fps = 1.0 / frame_interval if frame_interval else 1.0
+
+    # Pass 1: read each input chunk once, downsample, keep the small result on disk
+    chunks = []
+    mean = np.zeros(dim ** 3)
+    for first in range(0, frame_count, chunk_frames):
+        count = min(chunk_frames, frame_count - first)
+        frames = average(volume[..., first:first + count])
+        mean += frames.sum(axis=0)
+        name = f"activity_{len(chunks):04d}.bin"
+        frames.astype("<f4").tofile(os.path.join(out_dir, name))
+        chunks.append({"file": name, "firstFrame": first, "frameCount": count})
+        print(f"🧠 Frames {first}-{first + count - 1} downsampled")
+    mean /= frame_count
+
+    # Pass 2: optional baseline (relative change) and robust range over the small output
+    def transformed(chunk):
+        frames = np.fromfile(os.path.join(out_dir, chunk["file"]), dtype="<f4").reshape(-1, dim ** 3).astype(np.float64)
+        if baseline:
+            frames = np.where(mean > 0, frames / np.maximum(mean, 1e-12) - 1.0, 0.0)
+        return frames
+
+    lo = min(float(transformed(c).min()) for c in chunks) if not baseline else 0.0
+    hi = max(float(np.percentile(transformed(c), percentile)) for c in chunks)
+    span = hi - lo if hi > lo else 1.0
+
+    # Pass 3: normalize to the [0, 1] range the shaders expect
+    for chunk in chunks:
+        frames = np.clip((transformed(chunk) - lo) / span, 0.0, 1.0).astype("<f4")
+        frames.tofile(os.path.join(out_dir, chunk["file"]))
+
+    return {"frameCount": frame_count, "fps": fps, "range": [lo, hi], "baseline": baseline, "chunks": chunks}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert tractography and activity volumes for the renderer.")
+    parser.add_argument("--streamlines", help=".trk, .tck or .npz streamlines")
+    parser.add_argument("--activity", help=".nii/.nii.gz or .npy 4D activity volume")
+    parser.add_argument("--name", help="Dataset name (default: first input's file name)")
+    parser.add_argument("--out", help="Output directory (default public/datasets/<name>)")
+    placement = parser.add_mutually_exclusive_group()
+    placement.add_argument("--voxel-size", type=float, nargs=3, metavar=("X", "Y", "Z"),
+                           help="Voxel size (e.g. mm) of an .npy volume, origin at voxel 0")
+    placement.add_argument("--affine", help="Text file with the 4x4 voxel->RAS affine of an .npy volume")
+    parser.add_argument("--voxel-dim", type=int, default=VOXEL_DIM)
+    parser.add_argument("--chunk-frames", type=int, default=64, help="Frames per activity chunk file")
+    parser.add_argument("--fps", type=float, help="Playback rate (default 1/TR from the NIfTI header, else 1)")
+    parser.add_argument("--baseline", action="store_true", help="Show change relative to each voxel's temporal mean")
+    parser.add_argument("--percentile", type=float, default=99.5, help="Percentile mapped to full activity")
+    parser.add_argument("--step", type=float, default=2.0, help="Streamline resampling step (input units, e.g. mm)")
+    parser.add_argument("--max-points", type=int, default=64, help="Max points per streamline after resampling")
+    parser.add_argument("--min-length", type=float, default=10.0, help="Drop streamlines shorter than this")
+    parser.add_argument("--keep-every", type=int, default=1, help="Keep every Nth streamline (decimation)")
+    args = parser.parse_args()
+
+    if not args.streamlines and not args.activity:
+        parser.error("give --streamlines and/or --activity")
+    npy_affine = None
+    if args.voxel_size or args.affine:
+        if not (args.activity or "").endswith(".npy"):
+            parser.error("--voxel-size/--affine only apply to .npy activity volumes (NIfTI has its own affine)")
+        npy_affine = np.diag([*args.voxel_size, 1.0]) if args.voxel_size else np.loadtxt(args.affine).reshape(4, 4)
+    elif args.streamlines and (args.activity or "").endswith(".npy"):
+        print("⚠️ .npy volume without --voxel-size/--affine: assuming streamlines are in voxel coordinates")
+
+    source = args.activity or args.streamlines
+    name = args.name or os.path.basename(source).split(".")[0]
+    out_dir = args.out or os.path.join("public", "datasets", name)
+    os.makedirs(out_dir, exist_ok=True)
+
+    # One transform for both inputs so fibers and activity stay registered
+    if args.activity:
+        volume, affine, _ = open_volume(args.activity, npy_affine)
+        bounds = volume_bounds(volume.shape, affine)
+        if args.streamlines:
+            check_registration(streamline_bounds(args.streamlines, args.keep_every), bounds)
+        transform = RendererTransform(*bounds)
+    else:
+        transform = RendererTransform(*streamline_bounds(args.streamlines, args.keep_every))
+
+    manifest = {"version": 1, "name": name, "voxelDim": args.voxel_dim, "transform": transform.to_json()}
+    if args.streamlines:
+        manifest["fibers"] = convert_streamlines(args.streamlines, out_dir, transform, args.step,
+                                                 args.max_points, args.min_length, args.keep_every)
+    if args.activity:
+        manifest["activity"] = convert_activity(args.activity, out_dir, transform, args.voxel_dim,
+                                                args.chunk_frames, args.fps, args.baseline, args.percentile, npy_affine)
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"✅ Dataset written to {out_dir} (open the app with ?dataset={out_dir.replace(os.sep, '/').removeprefix('public/')}/manifest.json)")
+
+
+if __name__ == "__main__":
+    main()
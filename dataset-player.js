@@ -0,0 +1,173 @@
+// dataset-player.js
+// Streams datasets produced by convert_dataset.py: replaces the synthetic fibers
+// with imported streamlines and writes recorded activity into the tensor frame by frame.
+
+export class DatasetPlayer {
+    constructor(renderer) {
+        this.renderer = renderer;
+        this.manifest = null;
+        this.baseUrl = null;
+        this.isPlaying = false;
+        this.loop = true;
+
+        // Time State
+        this.elapsedTime = 0;
+        this.lastFrameTime = 0;
+        this.currentFrame = -1;
+        this.timerId = null;
+
+        // Activity chunks: index -> Float32Array, or a pending Promise while fetching
+        this.chunks = new Map();
+        // Failed chunks: index -> { attempts, retryAt } so a missing file is not refetched every frame
+        this.failedChunks = new Map();
+    }
+
+    get frameCount() {
+        return this.manifest?.activity ? this.manifest.activity.frameCount : 0;
+    }
+
+    get duration() {
+        return this.frameCount > 0 ? this.frameCount / this.manifest.activity.fps : 0;
+    }
+
+    async load(url) {
+        console.log(`[Dataset] Fetching manifest from: ${url}`);
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`Failed to load dataset: ${response.statusText}`);
+        }
+        this.manifest = await response.json();
+        this.baseUrl = response.url;
+        this.chunks.clear();
+        this.failedChunks.clear();
+
+        if (this.manifest.voxelDim !== this.renderer.voxelDim) {
+            throw new Error(`Dataset is ${this.manifest.voxelDim}^3 but the tensor grid is ${this.renderer.voxelDim}^3`);
+        }
+
+        if (this.manifest.fibers && this.manifest.fibers.vertexCount > 0) {
+            const fiberData = await this.fetchBinary(this.manifest.fibers.file);
+            this.renderer.setFiberData(new Float32Array(fiberData));
+            console.log(`[Dataset] Loaded ${this.manifest.fibers.streamlineCount} streamlines`);
+        }
+
+        if (this.frameCount > 0) {
+            await this.fetchChunk(0);
+            console.log(`[Dataset] ${this.frameCount} activity frames @ ${this.manifest.activity.fps} fps`);
+        }
+    }
+
+    async fetchBinary(file) {
+        const response = await fetch(new URL(file, this.baseUrl));
+        if (!response.ok) {
+            throw new Error(`Failed to load dataset file ${file}: ${response.statusText}`);
+        }
+        return response.arrayBuffer();
+    }
+
+    fetchChunk(index) {
+        const chunks = this.manifest.activity.chunks;
+        if (index >= chunks.length || this.chunks.has(index)) {
+            return this.chunks.get(index);
+        }
+        const failure = this.failedChunks.get(index);
+        if (failure && performance.now() < failure.retryAt) {
+            return undefined;
+        }
+        const pending = this.fetchBinary(chunks[index].file)
+            .then(buffer => {
+                const data = new Float32Array(buffer);
+                this.chunks.set(index, data);
+                this.failedChunks.delete(index);
+                return data;
+            })
+            .catch(error => {
+                // Exponential backoff: 1s, 2s, 4s ... capped at 30s
+                const attempts = (failure ? failure.attempts : 0) + 1;
+                const delay = Math.min(30000, 1000 * 2 ** (attempts - 1));
+                this.failedChunks.set(index, { attempts, retryAt: performance.now() + delay });
+                console.error(`[Dataset] Error loading chunk ${index} (retrying in ${delay / 1000}s):`, error);
+                this.chunks.delete(index);
+            });
+        this.chunks.set(index, pending);
+        return pending;
+    }
+
+    chunkIndexForFrame(frame) {
+        // Chunks are contiguous and equally sized except the last
+        const chunks = this.manifest.activity.chunks;
+        return Math.min(chunks.length - 1, Math.floor(frame / chunks[0].frameCount));
+    }
+
+    play() {
+        if (this.frameCount === 0) return;
+        this.stop();
+        this.isPlaying = true;
+        this.elapsedTime = 0;
+        this.lastFrameTime = performance.now();
+        // Recorded activity replaces the simulated physics while playing
+        this.renderer.externalActivity = true;
+        this.tick();
+        console.log("[Dataset] Playback started");
+    }
+
+    stop() {
+        this.isPlaying = false;
+        this.currentFrame = -1;
+        if (this.timerId) {
+            cancelAnimationFrame(this.timerId);
+            this.timerId = null;
+        }
+        this.renderer.externalActivity = false;
+    }
+
+    tick() {
+        if (!this.isPlaying) return;
+
+        const now = performance.now();
+        this.elapsedTime += (now - this.lastFrameTime) / 1000.0;
+        this.lastFrameTime = now;
+
+        let frame = Math.floor(this.elapsedTime * this.manifest.activity.fps);
+        if (frame >= this.frameCount) {
+            if (!this.loop) {
+                console.log("[Dataset] Finished");
+                this.stop();
+                return;
+            }
+            this.elapsedTime %= this.duration;
+            frame %= this.frameCount;
+        }
+
+        if (frame !== this.currentFrame && this.uploadFrame(frame)) {
+            this.currentFrame = frame;
+        }
+
+        this.timerId = requestAnimationFrame(() => this.tick());
+    }
+
+    uploadFrame(frame) {
+        const chunkIndex = this.chunkIndexForFrame(frame);
+        const chunks = this.manifest.activity.chunks;
+
+        // Prefetch the next chunk (wrapping for loops) and drop ones already played
+        this.fetchChunk((chunkIndex + 1) % chunks.length);
+        for (const index of this.chunks.keys()) {
+            if (index !== chunkIndex && index !== (chunkIndex + 1) % chunks.length) {
+                this.chunks.delete(index);
+            }
+        }
+
+        const data = this.chunks.get(chunkIndex);
+        if (!(data instanceof Float32Array)) {
+            // Still downloading: hold the previous frame
+            this.fetchChunk(chunkIndex);
+            return false;
+        }
+
+        const voxelCount = this.renderer.voxelCount;
+        const offset = (frame - chunks[chunkIndex].firstFrame) * voxelCount;
+        this.renderer.device.queue.writeBuffer(this.renderer.tensorBuffer, 0, data, offset, voxelCount);
+        return true;
+    }
+}
@@ -14,6 +14,8 @@ USERNAME = "ford442"
 LOCAL_DIRECTORY = "dist"
 # The directory on the server where the files should go (e.g., 'public_html/wasm-game').
 REMOTE_DIRECTORY = "test.1ink.us/brain-viz"
+# Files in dist/ that are never uploaded
+SKIPPED_SUFFIXES = (".map", ".br", ".gz")
 
 def upload_directory(sftp_client, local_path, remote_path):
     """
@@ -28,6 +30,11 @@ def upload_directory(sftp_client, local_path, remote_path):
         print(f"Directory {remote_path} already exists.")
 
     for item in os.listdir(local_path):
+        # Build/tooling artifacts: .vite/manifest.json, sourcemaps and the
+        # .br/.gz variants written by serve_dist.py --precompress
+        if item.startswith(".") or item.endswith(SKIPPED_SUFFIXES):
+            print(f"Skipping: {os.path.join(local_path, item)}")
+            continue
         local_item_path = os.path.join(local_path, item)
         remote_item_path = f"{remote_path}/{item}"
 
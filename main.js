@@ -4,6 +4,8 @@ import { BrainRenderer } from './brain-renderer.js';
 import { InferenceEngine } from './inference-engine.js';
 import { RoutinePlayer } from './routine-player.js'; // [NEW]
 import { AudioReactor } from './audio-reactor.js';   // [NEW]
+import { RegionAtlas } from './region-atlas.js';
+import { DatasetPlayer } from './dataset-player.js';
 
 // [Phase 3] Keyboard Triggered Routines
 const MINI_ROUTINES = {
@@ -69,20 +71,15 @@ async function init() {
     }
     
     try {
+        // Baked region atlas (bake_region_atlas.py) shared by shaders, routines and UI
+        const regionAtlas = await RegionAtlas.load('atlas/region_atlas.json');
+
         const renderer = new BrainRenderer(canvas);
-        await renderer.initialize();
+        await renderer.initialize(regionAtlas);
         
         // --- 1. SETUP ROUTINE PLAYER ---
-        // Define region map for easy scripting
-        const regionMap = {
-            'frontal': [0, 0, 1.2],
-            'occipital': [0, 0, -1.2],
-            'parietal': [0, 1.0, 0],
-            'temporal': [1.0, 0, 0],
-            'deep': [0, 0, 0]
-        };
-
-        const player = new RoutinePlayer(renderer, regionMap);
+        // Region names map to atlas stimulus anchors for easy scripting
+        const player = new RoutinePlayer(renderer, regionAtlas.regionMap);
         // [Phase 2] Register Mini-Routines for recursive 'call' support
         player.registerSubRoutines(MINI_ROUTINES);
 
@@ -376,7 +373,7 @@ async function init() {
         };
         controls.appendChild(audioBtn);
 
-        initUIControls(renderer, inputs, labels); // [Reuse existing function]
+        initUIControls(renderer, inputs, labels, regionAtlas); // [Reuse existing function]
 
         // UI & Audio Loop
         const updateLoop = () => {
@@ -435,6 +432,21 @@ async function init() {
         renderer.start();
         console.log('Renderer started');
 
+        // [Dataset] ?dataset=datasets/<name>/manifest.json streams converted real data
+        const datasetPlayer = new DatasetPlayer(renderer);
+        const datasetUrl = new URLSearchParams(window.location.search).get('dataset');
+        if (datasetUrl) {
+            try {
+                await datasetPlayer.load(datasetUrl);
+                datasetPlayer.play();
+            } catch (err) {
+                console.error('[Dataset] Error loading dataset:', err);
+            }
+        }
+
+        // Handle for the Python verification harness (deterministic stepping, readback)
+        window.neuroWeaver = { renderer, player, datasetPlayer };
+
     } catch (error) {
         console.error('Failed to initialize:', error);
         errorDiv.textContent = `Error: ${error.message}`;
@@ -443,7 +455,7 @@ async function init() {
 }
 
 // [Include your existing initUIControls function here unchanged]
-function initUIControls(renderer, uiInputs, uiLabels) {
+function initUIControls(renderer, uiInputs, uiLabels, regionAtlas) {
     // [Neuro-Weaver] Sync UI State with Renderer Params
     const syncParam = (paramKey, paramValue) => {
         const floatVal = parseFloat(paramValue);
@@ -482,21 +494,14 @@ function initUIControls(renderer, uiInputs, uiLabels) {
     }
 
     // [Neuro-Weaver] Stimulus Button Event Listeners
-    // Maps UI buttons to 3D brain coordinates for injection
-    const regions = [
-        { id: 'stim-frontal', pos: [0, 0, 1.2] },   // Frontal Lobe
-        { id: 'stim-occipital', pos: [0, 0, -1.2] }, // Occipital Lobe
-        { id: 'stim-parietal', pos: [0, 1.0, 0] },   // Parietal Lobe
-        { id: 'stim-temporal', pos: [1.0, 0, 0] },   // Temporal Lobe
-        { id: 'stim-deep', pos: [0, 0, 0] }          // Deep Structures
-    ];
-
-    regions.forEach(region => {
-        const btn = document.getElementById(region.id);
+    // Maps 'stim-<region>' buttons to the region atlas stimulus anchors
+    regionAtlas.regions.forEach(region => {
+        const btn = document.getElementById(`stim-${region.name}`);
         if (btn) {
             btn.addEventListener('click', () => {
                 // Inject stimulus at region coordinates with intensity 1.0
-                renderer.injectStimulus(region.pos[0], region.pos[1], region.pos[2], 1.0);
+                const [x, y, z] = region.anchor;
+                renderer.injectStimulus(x, y, z, 1.0);
             });
         }
     });
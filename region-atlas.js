@@ -0,0 +1,49 @@
+// region-atlas.js
+// Loads the voxel region atlas baked offline by bake_region_atlas.py.
+// The same table drives the compute shader physics, routine stimulus targets and the UI buttons.
+
+export class RegionAtlas {
+    constructor(meta, voxelWords) {
+        this.voxelDim = meta.voxelDim;
+        this.regions = meta.regions; // [{ id, name, anchor, decay, diffusion, flowBias }]
+        this.voxelWords = voxelWords; // Uint32Array, 4 packed uint8 region IDs per word
+    }
+
+    static async load(url) {
+        const response = await fetch(url);
+        if (!response.ok) {
+            throw new Error(`Failed to load region atlas: ${response.statusText}`);
+        }
+        const meta = await response.json();
+
+        const voxelResponse = await fetch(new URL(meta.voxels, response.url));
+        if (!voxelResponse.ok) {
+            throw new Error(`Failed to load region atlas voxels: ${voxelResponse.statusText}`);
+        }
+        const voxelData = await voxelResponse.arrayBuffer();
+
+        const expectedBytes = meta.voxelDim * meta.voxelDim * meta.voxelDim;
+        if (voxelData.byteLength !== expectedBytes) {
+            throw new Error(`Region atlas size (${voxelData.byteLength}) does not match ${meta.voxelDim}^3 voxels`);
+        }
+
+        // Little-endian uint8 bytes read as u32 are already packed 4 per word
+        return new RegionAtlas(meta, new Uint32Array(voxelData));
+    }
+
+    // Maps region names to stimulus coordinates, e.g. { frontal: [0, 0, 1.2] }
+    get regionMap() {
+        return Object.fromEntries(this.regions.map(region => [region.name, region.anchor]));
+    }
+
+    // One vec4 per region: (decay, diffusion, flowBias, unused)
+    getPhysicsData() {
+        const data = new Float32Array(this.regions.length * 4);
+        this.regions.forEach(region => {
+            data[region.id * 4] = region.decay;
+            data[region.id * 4 + 1] = region.diffusion;
+            data[region.id * 4 + 2] = region.flowBias;
+        });
+        return data;
+    }
+}
@@ -0,0 +1,302 @@
+"""
+Production-like static server for the Vite build in dist/.
+
+Reproduces what the deployed site does so previews, verification and
+benchmarks see real load behaviour instead of Vite's unbundled dev server:
+    - COOP/COEP headers from vite.config.js (needed for SharedArrayBuffer/WASM threads)
+    - Correct MIME types for .wasm, .mjs, .onnx and data files
+    - Strong ETags with If-None-Match -> 304
+    - `immutable` caching for hashed assets (assets/name-<hash>.ext), revalidation otherwise
+    - Single byte-range requests (206 / 416)
+    - Precompressed .br / .gz variants negotiated via Accept-Encoding
+    - Optional per-request latency and per-connection bandwidth shaping
+
+Usage:
+    npm run build
+    python serve_dist.py --precompress                  # http://localhost:4173
+    python serve_dist.py --latency 80 --bandwidth 1500  # ~fast 3G-ish: 80ms, 1.5 MB/s
+"""
+import argparse
+import gzip
+import os
+import re
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+LOCAL_DIRECTORY = "dist"
+DEFAULT_PORT = 4173  # Same as `vite preview`
+
+# Mirrors server.headers in vite.config.js
+CROSS_ORIGIN_HEADERS = {
+    "Cross-Origin-Opener-Policy": "same-origin",
+    "Cross-Origin-Embedder-Policy": "require-corp",
+}
+
+MIME_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".mjs": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".json": "application/json",
+    ".map": "application/json",
+    ".wasm": "application/wasm",
+    ".onnx": "application/octet-stream",
+    ".bin": "application/octet-stream",
+    ".svg": "image/svg+xml",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".ico": "image/x-icon",
+}
+
+# Preferred first; variants live next to the original as <file>.br / <file>.gz
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+COMPRESSIBLE = {".html", ".js", ".mjs", ".css", ".json", ".map", ".wasm", ".svg", ".onnx"}
+
+# Vite emits content-hashed files as assets/<name>-<hash>.<ext> with an 8 character
+# hash; files copied from public/ keep their names and must be revalidated
+HASHED_ASSET = re.compile(r"^assets/[^/]+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+CHUNK_SIZE = 16 * 1024
+
+
+def precompress(root, min_size=1024):
+    """Writes .gz (and .br when the brotli module is installed) next to compressible files."""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("⚠️ brotli module not installed, writing .gz only (pip install brotli)")
+
+    written = 0
+    for directory, _, files in os.walk(root):
+        for name in files:
+            path = os.path.join(directory, name)
+            if os.path.splitext(name)[1] not in COMPRESSIBLE or os.path.getsize(path) < min_size:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            variants = [(".gz", lambda d: gzip.compress(d, 9, mtime=0))]
+            if brotli:
+                variants.append((".br", lambda d: brotli.compress(d, quality=11)))
+            for suffix, compress in variants:
+                target = path + suffix
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                with open(target, "wb") as f:
+                    f.write(compress(data))
+                written += 1
+    print(f"🗜️ Precompressed {written} files in {root}")
+
+
+class DistRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "NeuroWeaverDist"
+
+    def do_GET(self):
+        self.serve(send_body=True)
+
+    def do_HEAD(self):
+        self.serve(send_body=False)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def resolve_path(self):
+        """Maps the request path into the served root; None for traversal or dotfiles."""
+        url_path = unquote(urlsplit(self.path).path)
+        if url_path.endswith("/"):
+            url_path += "index.html"
+        parts = [p for p in url_path.split("/") if p]
+        # Dotfiles (e.g. .vite/manifest.json) and parent references are never served
+        if any(p.startswith(".") for p in parts):
+            return None
+        path = os.path.join(self.server.root, *parts)
+        return path if os.path.isfile(path) else None
+
+    def accepted_encodings(self):
+        """Encodings from Accept-Encoding, excluding any the client refuses with q=0."""
+        accepted = set()
+        for token in self.headers.get("Accept-Encoding", "").split(","):
+            name, *params = [part.strip() for part in token.split(";")]
+            q = 1.0
+            for param in params:
+                key, _, value = param.partition("=")
+                if key.strip().lower() == "q":
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            if name and q > 0:
+                accepted.add(name.lower())
+        return accepted
+
+    def negotiate(self, path):
+        """Returns (encoding, file, has_variants) preferring precompressed variants the client accepts."""
+        accepted = self.accepted_encodings()
+        mtime = os.path.getmtime(path)
+        has_variants = False
+        for encoding, suffix in ENCODINGS:
+            variant = path + suffix
+            # A variant older than the original is stale (rebuilt without --precompress)
+            if os.path.isfile(variant) and os.path.getmtime(variant) >= mtime:
+                has_variants = True
+                if encoding in accepted:
+                    return encoding, variant, True
+        return None, path, has_variants
+
+    def serve(self, send_body):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+
+        path = self.resolve_path()
+        if path is None:
+            self.send_plain(404, b"Not Found")
+            return
+
+        encoding, file_path, has_variants = self.negotiate(path)
+        stat = os.stat(file_path)
+        size = stat.st_size
+        etag = f'"{size:x}-{stat.st_mtime_ns:x}{"-" + encoding if encoding else ""}"'
+
+        headers = dict(CROSS_ORIGIN_HEADERS)
+        headers["Content-Type"] = MIME_TYPES.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+        headers["ETag"] = etag
+        headers["Last-Modified"] = formatdate(stat.st_mtime, usegmt=True)
+        rel = os.path.relpath(path, self.server.root).replace(os.sep, "/")
+        headers["Cache-Control"] = IMMUTABLE if HASHED_ASSET.match(rel) else REVALIDATE
+        headers["Accept-Ranges"] = "bytes"
+        if has_variants:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            headers["Content-Encoding"] = encoding
+
+        if etag in [t.strip() for t in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            for key in ("ETag", "Cache-Control", "Vary", *CROSS_ORIGIN_HEADERS):
+                if key in headers:
+                    self.send_header(key, headers[key])
+            self.end_headers()
+            return
+
+        start, end = 0, size - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (not if_range or if_range == etag):
+            byte_range = self.parse_range(range_header, size)
+            if byte_range is None:
+                # The error body is plain text: none of the file's encoding or caching headers apply
+                self.send_plain(416, b"Range Not Satisfiable", {**CROSS_ORIGIN_HEADERS, "Content-Range": f"bytes */{size}"})
+                return
+            if byte_range != "ignore":
+                start, end = byte_range
+                status = 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+        length = max(0, end - start + 1)
+        headers["Content-Length"] = str(length)
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+
+        if send_body and length:
+            with open(file_path, "rb") as f:
+                f.seek(start)
+                self.copy_throttled(f, length)
+
+    @staticmethod
+    def parse_range(header, size):
+        """Parses a single `bytes=` range. Returns (start, end), None if unsatisfiable,
+        or "ignore" for forms we do not support (multi-range), which get a full 200."""
+        match = re.fullmatch(r"bytes=(\d*)-(\d*)", header.strip())
+        if not match or size == 0:
+            return "ignore" if not match else None
+        first, last = match.groups()
+        if first == "" and last == "":
+            return "ignore"
+        if first == "":
+            # Suffix range: the last N bytes
+            length = int(last)
+            return (max(0, size - length), size - 1) if length > 0 else None
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or start > end:
+            return None
+        return start, end
+
+    def copy_throttled(self, f, length):
+        bandwidth = self.server.bandwidth
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            began = time.perf_counter()
+            self.wfile.write(chunk)
+            remaining -= len(chunk)
+            if bandwidth:
+                delay = len(chunk) / bandwidth - (time.perf_counter() - began)
+                if delay > 0:
+                    time.sleep(delay)
+
+    def send_plain(self, status, body, headers=None):
+        headers = headers or CROSS_ORIGIN_HEADERS
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if "Content-Type" not in headers:
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+
+def create_server(root=LOCAL_DIRECTORY, port=DEFAULT_PORT, host="127.0.0.1", latency_ms=0, bandwidth_kbps=0, quiet=False):
+    server = ThreadingHTTPServer((host, port), DistRequestHandler)
+    server.daemon_threads = True
+    server.root = os.path.abspath(root)
+    server.latency = latency_ms / 1000.0
+    server.bandwidth = bandwidth_kbps * 1000  # bytes per second, per connection
+    server.quiet = quiet
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve dist/ with production headers, caching and compression.")
+    parser.add_argument("--root", default=LOCAL_DIRECTORY)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--precompress", action="store_true", help="Write .br/.gz variants before serving")
+    parser.add_argument("--latency", type=float, default=0, help="Added latency per request (ms)")
+    parser.add_argument("--bandwidth", type=float, default=0, help="Per-connection bandwidth cap (KB/s, 0 = unlimited)")
+    parser.add_argument("--quiet", action="store_true", help="Do not log requests")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Error: Local directory '{args.root}' not found. Did you run 'npm run build' first?")
+        return
+    if args.precompress:
+        precompress(args.root)
+
+    server = create_server(args.root, args.port, args.host, args.latency, args.bandwidth, args.quiet)
+    print(f"🚀 Serving {args.root} at http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -22,45 +22,6 @@ const HELPERS = `
         return exp(-k * dist * dist);
     }
 
-    // [Neuro-Weaver] Refactored: Region Physics Logic (Renamed for V2.7)
-    // Returns vec3(decay, diffusion, flowBias)
-    // [Neuro-Weaver] Defines anatomical zones: Frontal, Occipital, Temporal, Parietal
-    fn getRegionPhysics(worldPosition: vec3<f32>, style: f32) -> vec3<f32> {
-        var decay = 0.96;
-        var diffusion = 0.1;
-        var flowBias = 0.0;
-
-        // Frontal Lobe: High retention for complex thought
-        if (worldPosition.z > 0.5) {
-            decay = 0.998; // [Neuro-Weaver] V2.6: Hyper-retention for deep thought
-            diffusion = 0.15;
-            // [Neuro-Weaver] Directional Flow: Signals drift from Frontal towards Occipital
-            flowBias = -1.0;
-        }
-        // Occipital Lobe: Fast processing, visual inputs
-        else if (worldPosition.z < -0.5) {
-            decay = 0.92;
-            diffusion = 0.04;
-        }
-        // Temporal Lobe: Auditory/Memory
-        else if (abs(worldPosition.x) > 0.8) {
-            decay = 0.95;
-        }
-        // Parietal Lobe: Sensory integration
-        else if (worldPosition.y > 0.6) {
-            decay = 0.94;
-            diffusion = 0.12;
-        }
-
-        // Cyber Mode (Style 1): Digital signal logic
-        if (abs(style - 1.0) < 0.1) {
-            diffusion = 0.05;
-            decay = 0.92;
-            flowBias = 0.0;
-        }
-        return vec3<f32>(decay, diffusion, flowBias);
-    }
-
     // [Neuro-Weaver] Refactored: Signal Flow Logic (Renamed for V2.7)
     fn calculateSignalFlow(vertexIndex: u32, worldPos: vec3<f32>, time: f32, speed: f32, flowScale: f32) -> f32 {
         // [Neuro-Weaver] Refactored: Calculate flow along the fiber
@@ -134,9 +95,58 @@ fn getVoxelValue(worldPos: vec3<f32>) -> f32 {
     return activityTensor[index];
 }
 
+// --- CONNECTOME MODE ---
+// [V2.3] Traveling Pulse Logic (Activity Trails)
+// [Neuro-Weaver] Simulates information flow along the axon fibers using spatial phase offset
+// Signals travel along the fibers based on the source vertex index and flow speed
+// Returns vec4(color, signalStrength)
+fn shadeFiber(position: vec3<f32>, sourceIndex: u32, activity: f32) -> vec4<f32> {
+    let worldPos = (uniforms.modelMatrix * vec4<f32>(position, 1.0)).xyz;
+
+    var baseColor = vec3<f32>(0.05, 0.1, 0.15); // Dark Blue Base
+    var pulseColor = vec3<f32>(0.0, 0.8, 1.0); // Cyan Pulse
+
+    // [Phase 5] Serotonin Color Shift (Blue -> Gold/Red)
+    if (uniforms.colorShift > 0.0) {
+         let warmBase = vec3<f32>(0.2, 0.05, 0.05); // Deep Red
+         let warmPulse = vec3<f32>(1.0, 0.8, 0.2); // Gold
+         baseColor = mix(baseColor, warmBase, uniforms.colorShift);
+         pulseColor = mix(pulseColor, warmPulse, uniforms.colorShift);
+    }
+
+    // [Neuro-Weaver] Refactored: Use helper function calculateSignalFlow
+    let signalStrength = calculateSignalFlow(sourceIndex, worldPos, uniforms.time, uniforms.flowSpeed, FLOW_SCALE);
+
+    // Blend based on activity
+    // Glow is the resting state activity
+    let glow = mix(baseColor, pulseColor * 0.5, activity);
+    // Flash is the moving signal pulse
+    let flash = pulseColor * signalStrength * activity;
+
+    return vec4<f32>(glow + flash, signalStrength);
+}
+
+fn buildOutput(finalPos: vec3<f32>, finalNormal: vec3<f32>, finalColor: vec3<f32>, activity: f32, signalStrength: f32) -> VertexOutput {
+    var output: VertexOutput;
+    output.position = uniforms.mvpMatrix * vec4<f32>(finalPos, 1.0);
+    output.worldPos = (uniforms.modelMatrix * vec4<f32>(finalPos, 1.0)).xyz;
+    output.normal = normalize((uniforms.modelMatrix * vec4<f32>(finalNormal, 0.0)).xyz);
+    output.color = finalColor;
+    output.activity = activity;
+    output.signal = signalStrength;
+    // [V2.3] Clipping Logic: Calculate distance to plane
+    // [Neuro-Weaver] Refactored: Renamed planeDist to sliceDepth for clarity
+    // Clipping Logic: Dot product determines side of the plane
+    // [Neuro-Weaver] V2.6: Use slicePlane
+    let planeNormal = uniforms.slicePlane.xyz;
+    let sliceDepth = uniforms.slicePlane.w;
+    output.clipDist = dot(output.worldPos, planeNormal) + sliceDepth;
+    
+    return output;
+}
+
 @vertex
 fn main(input: VertexInput, @builtin(vertex_index) vertexIndex: u32) -> VertexOutput {
-    var output: VertexOutput;
     var finalPos = input.position;
     var finalNormal = input.normal;
     var finalColor = vec3<f32>(0.0);
@@ -144,36 +154,12 @@ fn main(input: VertexInput, @builtin(vertex_index) vertexIndex: u32) -> VertexOu
     
     let activity = getVoxelValue(input.position);
 
-    let worldPos = (uniforms.modelMatrix * vec4<f32>(finalPos, 1.0)).xyz;
-
     // --- CONNECTOME MODE ---
-    // [V2.3] Traveling Pulse Logic (Activity Trails)
-    // [Neuro-Weaver] Simulates information flow along the axon fibers using spatial phase offset
-    // Signals travel along the fibers based on vertex index and flow speed
+    // Uncompacted fiber buffer: the vertex index is the source index
     if (uniforms.style >= 2.0 && uniforms.style < 3.0) {
-        finalPos = input.position;
-
-        var baseColor = vec3<f32>(0.05, 0.1, 0.15); // Dark Blue Base
-        var pulseColor = vec3<f32>(0.0, 0.8, 1.0); // Cyan Pulse
-
-        // [Phase 5] Serotonin Color Shift (Blue -> Gold/Red)
-        if (uniforms.colorShift > 0.0) {
-             let warmBase = vec3<f32>(0.2, 0.05, 0.05); // Deep Red
-             let warmPulse = vec3<f32>(1.0, 0.8, 0.2); // Gold
-             baseColor = mix(baseColor, warmBase, uniforms.colorShift);
-             pulseColor = mix(pulseColor, warmPulse, uniforms.colorShift);
-        }
-
-        // [Neuro-Weaver] Refactored: Use helper function calculateSignalFlow
-        signalStrength = calculateSignalFlow(vertexIndex, worldPos, uniforms.time, uniforms.flowSpeed, FLOW_SCALE);
-
-        // Blend based on activity
-        // Glow is the resting state activity
-        let glow = mix(baseColor, pulseColor * 0.5, activity);
-        // Flash is the moving signal pulse
-        let flash = pulseColor * signalStrength * activity;
-
-        finalColor = glow + flash;
+        let shaded = shadeFiber(input.position, vertexIndex, activity);
+        finalColor = shaded.rgb;
+        signalStrength = shaded.a;
         finalNormal = vec3<f32>(0.0, 1.0, 0.0);
     }
     // --- HEATMAP MODE ---
@@ -212,21 +198,22 @@ fn main(input: VertexInput, @builtin(vertex_index) vertexIndex: u32) -> VertexOu
         }
     }
 
-    output.position = uniforms.mvpMatrix * vec4<f32>(finalPos, 1.0);
-    output.worldPos = (uniforms.modelMatrix * vec4<f32>(finalPos, 1.0)).xyz;
-    output.normal = normalize((uniforms.modelMatrix * vec4<f32>(finalNormal, 0.0)).xyz);
-    output.color = finalColor;
-    output.activity = activity;
-    output.signal = signalStrength;
-    // [V2.3] Clipping Logic: Calculate distance to plane
-    // [Neuro-Weaver] Refactored: Renamed planeDist to sliceDepth for clarity
-    // Clipping Logic: Dot product determines side of the plane
-    // [Neuro-Weaver] V2.6: Use slicePlane
-    let planeNormal = uniforms.slicePlane.xyz;
-    let sliceDepth = uniforms.slicePlane.w;
-    output.clipDist = dot(output.worldPos, planeNormal) + sliceDepth;
-    
-    return output;
+    return buildOutput(finalPos, finalNormal, finalColor, activity, signalStrength);
+}
+
+// [GPU Culling] Compacted fiber vertices: vec4(position, bitcast sourceIndex)
+// sourceIndex keeps the pulse phase identical to the uncompacted draw; it is read
+// back through a uint32 attribute so indices above 2^24 stay exact
+struct FiberInput {
+    @location(0) position: vec3<f32>,
+    @location(1) sourceIndex: u32,
+}
+
+@vertex
+fn main_fiber(input: FiberInput) -> VertexOutput {
+    let activity = getVoxelValue(input.position);
+    let shaded = shadeFiber(input.position, input.sourceIndex, activity);
+    return buildOutput(input.position, vec3<f32>(0.0, 1.0, 0.0), shaded.rgb, activity, shaded.a);
 }
 `;
 
@@ -399,11 +386,31 @@ struct TensorParams {
 
 @group(0) @binding(0) var<storage, read_write> activityTensor: array<f32>;
 @group(0) @binding(1) var<uniform> params: TensorParams;
+// [Region Atlas] Baked offline by bake_region_atlas.py
+// Four uint8 region IDs packed per u32, indexed like activityTensor
+@group(0) @binding(2) var<storage, read> regionAtlas: array<u32>;
+// Per-region physics: vec4(decay, diffusion, flowBias, unused)
+@group(0) @binding(3) var<storage, read> regionPhysics: array<vec4<f32>>;
 
 fn getIndex(x: u32, y: u32, z: u32) -> u32 {
     return z * params.voxelDim * params.voxelDim + y * params.voxelDim + x;
 }
 
+fn getRegionId(index: u32) -> u32 {
+    return (regionAtlas[index >> 2u] >> ((index & 3u) * 8u)) & 0xFFu;
+}
+
+// [Neuro-Weaver] Region Physics Lookup
+// Returns vec3(decay, diffusion, flowBias) from the atlas table instead of
+// classifying the position with branches on every invocation.
+fn getRegionPhysics(index: u32, style: f32) -> vec3<f32> {
+    // Cyber Mode (Style 1): Digital signal logic (uniform for the whole dispatch)
+    if (abs(style - 1.0) < 0.1) {
+        return vec3<f32>(0.92, 0.05, 0.0);
+    }
+    return regionPhysics[getRegionId(index)].xyz;
+}
+
 @compute @workgroup_size(64)
 fn main(@builtin(global_invocation_id) globalId: vec3<u32>) {
     // [V2.5] Compute Physics
@@ -424,9 +431,8 @@ fn main(@builtin(global_invocation_id) globalId: vec3<u32>) {
     let worldPosition = (normalizedPosition * 2.0 - 1.0) * BRAIN_RANGE;
 
     // [V2.5] Region Mapping Implementation
-    // Defines anatomical zones for varying signal decay and diffusion properties.
-    // [Neuro-Weaver] Refactored: Use helper function
-    let physics = getRegionPhysics(worldPosition, params.style);
+    // Anatomical zones (Frontal, Occipital, Temporal, Parietal) come from the region atlas.
+    let physics = getRegionPhysics(index, params.style);
     let decay = physics.x;
     let diffusion = physics.y;
     let flowBias = physics.z;
@@ -479,3 +485,107 @@ fn main(@builtin(global_invocation_id) globalId: vec3<u32>) {
     activityTensor[index] = clamp(val, 0.0, 1.0);
 }
 `;
+
+export const cullShader = `
+// [GPU Culling] Filters soma instances and fiber segments against the slice
+// plane and view frustum, compacting survivors for indirect draws.
+struct Uniforms {
+    mvpMatrix: mat4x4<f32>,
+    modelMatrix: mat4x4<f32>,
+    time: f32,
+    style: f32,
+    flowSpeed: f32,
+    colorShift: f32,
+    slicePlane: vec4<f32>,
+}
+
+// Largest soma radius: icosahedron (unit) * (0.02 + activity * 0.12), activity <= 1
+const SOMA_MAX_RADIUS: f32 = 0.14;
+// drawArgs layout (u32):
+// [0..4]  soma drawIndexedIndirect (indexCount, instanceCount, firstIndex, baseVertex, firstInstance)
+// [8..11] fiber drawIndirect (vertexCount, instanceCount, firstVertex, firstInstance)
+const SOMA_INSTANCE_COUNT: u32 = 1u;
+const FIBER_VERTEX_COUNT: u32 = 8u;
+
+@group(0) @binding(0) var<uniform> uniforms: Uniforms;
+@group(0) @binding(1) var<storage, read> somaIn: array<f32>;
+@group(0) @binding(2) var<storage, read_write> somaOut: array<f32>;
+@group(0) @binding(3) var<storage, read> fiberIn: array<f32>;
+@group(0) @binding(4) var<storage, read_write> fiberOut: array<vec4<f32>>;
+@group(0) @binding(5) var<storage, read_write> drawArgs: array<atomic<u32>, 12>;
+
+fn matrixRow(m: mat4x4<f32>, r: u32) -> vec4<f32> {
+    return vec4<f32>(m[0][r], m[1][r], m[2][r], m[3][r]);
+}
+
+// Frustum planes from the MVP (Gribb-Hartmann, WebGPU depth range [0, w])
+fn frustumPlanes() -> array<vec4<f32>, 6> {
+    let m = uniforms.mvpMatrix;
+    let r0 = matrixRow(m, 0u);
+    let r1 = matrixRow(m, 1u);
+    let r2 = matrixRow(m, 2u);
+    let r3 = matrixRow(m, 3u);
+    return array<vec4<f32>, 6>(r3 + r0, r3 - r0, r3 + r1, r3 - r1, r2, r3 - r2);
+}
+
+// Same signed distance the vertex shaders write to clipDist
+fn sliceDistance(position: vec3<f32>) -> f32 {
+    let worldPos = (uniforms.modelMatrix * vec4<f32>(position, 1.0)).xyz;
+    return dot(worldPos, uniforms.slicePlane.xyz) + uniforms.slicePlane.w;
+}
+
+fn sphereVisible(center: vec3<f32>, radius: f32) -> bool {
+    if (sliceDistance(center) < -radius) { return false; }
+    var planes = frustumPlanes();
+    for (var i = 0u; i < 6u; i++) {
+        let p = planes[i];
+        if (dot(p.xyz, center) + p.w < -radius * length(p.xyz)) { return false; }
+    }
+    return true;
+}
+
+fn segmentVisible(a: vec3<f32>, b: vec3<f32>) -> bool {
+    if (max(sliceDistance(a), sliceDistance(b)) < 0.0) { return false; }
+    var planes = frustumPlanes();
+    for (var i = 0u; i < 6u; i++) {
+        let p = planes[i];
+        if (dot(p.xyz, a) + p.w < 0.0 && dot(p.xyz, b) + p.w < 0.0) { return false; }
+    }
+    return true;
+}
+
+// Workgroups are dispatched in 2D (BrainRenderer.dispatchLinear) so large
+// imported fiber sets stay under maxComputeWorkgroupsPerDimension
+fn linearIndex(globalId: vec3<u32>, numGroups: vec3<u32>) -> u32 {
+    return globalId.x + globalId.y * numGroups.x * 64u;
+}
+
+@compute @workgroup_size(64)
+fn cull_somas(@builtin(global_invocation_id) globalId: vec3<u32>, @builtin(num_workgroups) numGroups: vec3<u32>) {
+    let i = linearIndex(globalId, numGroups);
+    if (i >= arrayLength(&somaIn) / 3u) { return; }
+
+    let center = vec3<f32>(somaIn[i * 3u], somaIn[i * 3u + 1u], somaIn[i * 3u + 2u]);
+    if (!sphereVisible(center, SOMA_MAX_RADIUS)) { return; }
+
+    let slot = atomicAdd(&drawArgs[SOMA_INSTANCE_COUNT], 1u);
+    somaOut[slot * 3u] = center.x;
+    somaOut[slot * 3u + 1u] = center.y;
+    somaOut[slot * 3u + 2u] = center.z;
+}
+
+@compute @workgroup_size(64)
+fn cull_fibers(@builtin(global_invocation_id) globalId: vec3<u32>, @builtin(num_workgroups) numGroups: vec3<u32>) {
+    let segment = linearIndex(globalId, numGroups);
+    if (segment >= arrayLength(&fiberIn) / 6u) { return; }
+
+    let base = segment * 6u;
+    let a = vec3<f32>(fiberIn[base], fiberIn[base + 1u], fiberIn[base + 2u]);
+    let b = vec3<f32>(fiberIn[base + 3u], fiberIn[base + 4u], fiberIn[base + 5u]);
+    if (!segmentVisible(a, b)) { return; }
+
+    let slot = atomicAdd(&drawArgs[FIBER_VERTEX_COUNT], 2u);
+    fiberOut[slot] = vec4<f32>(a, bitcast<f32>(segment * 2u));
+    fiberOut[slot + 1u] = vec4<f32>(b, bitcast<f32>(segment * 2u + 1u));
+}
+`;
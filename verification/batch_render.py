@@ -0,0 +1,176 @@
+"""
+Headless batch renderer: plays a routine at the app's fixed simulation step
+(16 ms, as in the live app) and writes canvas frames sampled at the output
+fps, without screen recording. The output fps only chooses which simulation
+frames are captured, so it does not change the clip's content.
+
+The timeline is split into contiguous frame ranges, one per worker process,
+each with its own browser. Because the harness clock and Math.random are
+deterministic, a worker fast-forwards to the start of its range with the
+draw pass skipped (compute and routine ticks only) and produces the same
+frames a single sequential run would. Rasterization, readback and encoding
+dominate the cost, so wall time scales with workers.
+
+Usage:
+    python verification/batch_render.py routines/deep_thought.json --fps 30 --workers 4
+    python verification/batch_render.py routines/deep_thought.json --encoder ffmpeg
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from playwright.sync_api import sync_playwright
+
+from harness import APP_URL, DEFAULT_SEED, FRAME_MS, capture_canvas, fast_forward, launch_browser, open_app
+
+DEFAULT_TAIL = 1.0  # Seconds rendered past the last event so lerps/decay settle
+
+
+def routine_duration(routine):
+    """Last event time, extended by any lerp still running at that point."""
+    end = 0.0
+    for event in routine:
+        end = max(end, event.get("time", 0.0) + (event.get("duration", 0.0) if event.get("type") == "lerp" else 0.0))
+    return end
+
+
+def split_frames(total, workers):
+    """Splits [0, total) into `workers` contiguous (start, end) ranges."""
+    workers = max(1, min(workers, total))
+    size, extra = divmod(total, workers)
+    ranges = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def simulation_frame(frame, fps):
+    """Index of the fixed-step simulation frame shown at output frame `frame`."""
+    return round(frame * (1000.0 / fps) / FRAME_MS)
+
+
+def start_encoder(path, fps):
+    """Spawns an ffmpeg process that reads PNG frames from stdin."""
+    return subprocess.Popen(
+        ["ffmpeg", "-y", "-loglevel", "error", "-f", "image2pipe", "-framerate", str(fps), "-c:v", "png", "-i", "-",
+         "-c:v", "libx264", "-pix_fmt", "yuv420p", path],
+        stdin=subprocess.PIPE,
+    )
+
+
+def render_range(job):
+    """Worker entry point: renders frames [start, end) of the routine."""
+    index, start, end, opts = job
+    began = time.perf_counter()
+
+    encoder = None
+    if opts["encoder"] == "ffmpeg":
+        encoder = start_encoder(os.path.join(opts["out"], f"segment_{index:03d}.mp4"), opts["fps"])
+
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        try:
+            page = open_app(browser, url=opts["url"], seed=opts["seed"],
+                            viewport={"width": opts["width"], "height": opts["height"]})
+            page.evaluate(
+                """(routine) => {
+                    const { player } = window.neuroWeaver;
+                    player.loadRoutine(routine, false);
+                    player.play();
+                }""",
+                opts["routine"],
+            )
+
+            # Output frame N is the canvas after simulation_frame(N) + 1 steps
+            # from playback start; every step in between only runs the simulation
+            stepped = 0
+            for frame in range(start, end):
+                target = simulation_frame(frame, opts["fps"]) + 1
+                if target > stepped:
+                    fast_forward(page, target - stepped - 1)
+                    data = capture_canvas(page, 1)
+                    stepped = target
+                # Above 62.5 fps consecutive output frames repeat a simulation frame
+                if encoder:
+                    encoder.stdin.write(data)
+                else:
+                    with open(os.path.join(opts["out"], f"frame_{frame:06d}.png"), "wb") as f:
+                        f.write(data)
+        finally:
+            browser.close()
+            if encoder:
+                encoder.stdin.close()
+                encoder.wait()
+
+    elapsed = time.perf_counter() - began
+    print(f"🎞️ Worker {index}: frames {start}-{end - 1} in {elapsed:.1f}s")
+    return index
+
+
+def concat_segments(out_dir, count, output):
+    list_path = os.path.join(out_dir, "segments.txt")
+    with open(list_path, "w") as f:
+        for i in range(count):
+            f.write(f"file 'segment_{i:03d}.mp4'\n")
+    subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output], check=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a routine to a frame sequence or video.")
+    parser.add_argument("routine", nargs="?", default="routines/deep_thought.json")
+    parser.add_argument("--out", help="Output directory (default renders/<routine name>)")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--duration", type=float, help="Seconds to render (default routine length + tail)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--encoder", choices=["none", "ffmpeg"], default="none")
+    parser.add_argument("--url", default=APP_URL)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    args = parser.parse_args()
+
+    with open(args.routine) as f:
+        routine = json.load(f)
+
+    name = os.path.splitext(os.path.basename(args.routine))[0]
+    out_dir = args.out or os.path.join("renders", name)
+    os.makedirs(out_dir, exist_ok=True)
+
+    if args.encoder == "ffmpeg" and not shutil.which("ffmpeg"):
+        print("❌ ffmpeg not found on PATH")
+        sys.exit(1)
+
+    duration = args.duration if args.duration is not None else routine_duration(routine) + DEFAULT_TAIL
+    total = max(1, round(duration * args.fps))
+    ranges = split_frames(total, args.workers)
+
+    opts = {
+        "routine": routine, "out": out_dir, "fps": args.fps, "encoder": args.encoder,
+        "url": args.url, "seed": args.seed, "width": args.width, "height": args.height,
+    }
+    print(f"🎬 Rendering {name}: {total} frames ({duration:.1f}s @ {args.fps:g}fps) on {len(ranges)} workers")
+
+    began = time.perf_counter()
+    jobs = [(i, start, end, opts) for i, (start, end) in enumerate(ranges)]
+    with ProcessPoolExecutor(max_workers=len(jobs)) as pool:
+        list(pool.map(render_range, jobs))
+
+    if args.encoder == "ffmpeg":
+        output = os.path.join(out_dir, f"{name}.mp4")
+        concat_segments(out_dir, len(jobs), output)
+        print(f"✅ Wrote {output}")
+    else:
+        print(f"✅ Wrote {total} frames to {out_dir}")
+    print(f"Finished in {time.perf_counter() - began:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Connectome rendering benchmark: draw counts and frame time with GPU culling
+off (full fiber/soma draws) and on (compute culling + indirect draws).
+
+Each scenario is rendered from a reset state under the deterministic harness
+clock. Frame time is wall time for a batch of frames including GPU completion
+(CPU encode + GPU work), so it reflects SwiftShader cost when run headless.
+
+Usage:
+    python verification/benchmark.py --frames 240
+    python verification/benchmark.py --json verification/benchmark.json
+    python verification/benchmark.py --dist              # production build via serve_dist.py
+"""
+import argparse
+import json
+from contextlib import nullcontext
+
+from playwright.sync_api import sync_playwright
+
+from harness import APP_URL, DEFAULT_SEED, dist_server, launch_browser, open_app, reset_app, select_style, set_slider, step_frames
+
+# Connectome views from full brain to heavily clipped/zoomed
+SCENARIOS = [
+    {"name": "full", "clip": 2.0},
+    {"name": "sliced", "clip": 0.0},
+    {"name": "sliced_deep", "clip": -0.8},
+    {"name": "zoomed", "clip": 2.0, "zoom": 2.0, "rotation": {"x": 0.3, "y": 0.6}},
+    {"name": "zoomed_sliced", "clip": 0.3, "zoom": 2.0, "rotation": {"x": 0.3, "y": 0.6}},
+]
+
+TIME_FRAMES_SCRIPT = """
+async (count) => {
+    const { renderer } = window.neuroWeaver;
+    await renderer.device.queue.onSubmittedWorkDone();
+    const start = window.__nwClock.realNow();
+    await window.__nwClock.step(count);
+    return (window.__nwClock.realNow() - start) / count;
+}
+"""
+
+DRAW_COUNTS_SCRIPT = """
+async () => {
+    const { renderer } = window.neuroWeaver;
+    if (renderer.gpuCulling && renderer.cullBindGroup) return await renderer.readCullStats();
+    return {
+        somas: renderer.somaInstanceCount,
+        somaTotal: renderer.somaInstanceCount,
+        fiberSegments: renderer.fiberVertexCount / 2,
+        fiberSegmentTotal: renderer.fiberVertexCount / 2
+    };
+}
+"""
+
+
+def run_scenario(page, scenario, culling, frames, warmup):
+    reset_app(page)
+    page.evaluate("(enabled) => { window.neuroWeaver.renderer.gpuCulling = enabled; }", culling)
+    select_style(page, 2)
+    set_slider(page, "clip", scenario["clip"])
+    camera = {key: scenario[key] for key in ("zoom", "rotation") if key in scenario}
+    if camera:
+        page.evaluate("(camera) => window.neuroWeaver.renderer.setCameraParams(camera)", camera)
+    # Warm-up also lets the smoothed camera settle on its target
+    step_frames(page, warmup)
+    frame_ms = page.evaluate(TIME_FRAMES_SCRIPT, frames)
+    counts = page.evaluate(DRAW_COUNTS_SCRIPT)
+    return {"frame_ms": frame_ms, **counts}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Connectome draws with and without GPU culling.")
+    parser.add_argument("--url", default=APP_URL)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--frames", type=int, default=240)
+    parser.add_argument("--warmup", type=int, default=90)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--dist", action="store_true", help="Benchmark the production build served by serve_dist.py")
+    args = parser.parse_args()
+
+    results = []
+    with dist_server() if args.dist else nullcontext(args.url) as url, sync_playwright() as p:
+        browser = launch_browser(p)
+        try:
+            page = open_app(browser, url=url, seed=args.seed)
+            for scenario in SCENARIOS:
+                before = run_scenario(page, scenario, False, args.frames, args.warmup)
+                after = run_scenario(page, scenario, True, args.frames, args.warmup)
+                results.append({"scenario": scenario["name"], "before": before, "after": after})
+        finally:
+            browser.close()
+
+    print(f"{'scenario':<14} {'somas':>15} {'fiber segments':>17} {'ms/frame':>18}")
+    for r in results:
+        b, a = r["before"], r["after"]
+        speedup = b["frame_ms"] / a["frame_ms"] if a["frame_ms"] > 0 else 0.0
+        print(f"{r['scenario']:<14} {b['somas']:>7} -> {a['somas']:<6} {b['fiberSegments']:>8} -> {a['fiberSegments']:<7} "
+              f"{b['frame_ms']:>6.2f} -> {a['frame_ms']:<6.2f} ({speedup:.2f}x)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"frames": args.frames, "results": results}, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
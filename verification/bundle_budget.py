@@ -0,0 +1,482 @@
+"""
+Bundle size and startup budget check for the production build.
+
+Reads dist/ and the Vite manifest (dist/.vite/manifest.json), attributes raw,
+gzip and brotli bytes to source modules (via sourcemaps) and assets, measures
+time-to-first-frame by loading the build through serve_dist.py in the
+verification browser, then checks everything against
+verification/bundle_budget.json and diffs it with the last recorded build.
+
+Per-module and per-package attribution of JS needs sourcemaps; without them
+each chunk is reported as a whole and package/module budgets are an error.
+Hidden maps keep the sourceMappingURL comment out of the bundle (deploy.py
+does not upload .map files):
+    npm run build -- --sourcemap hidden
+
+Packages cover JavaScript only; emitted and public files (the ORT wasm, the
+ONNX model, atlas binaries) are budgeted separately under `assets`.
+
+Budgets are derived from a recorded build rather than guessed: record a
+baseline, then --derive-budgets writes limits with some headroom over it.
+
+Compressed sizes of modules inside a chunk are the chunk's real compressed
+size split in proportion to each module's standalone compressed size, so they
+add up to what is actually served.
+
+Usage:
+    python verification/bundle_budget.py                      # analyze, measure, check
+    python verification/bundle_budget.py --skip-ttff          # sizes only
+    python verification/bundle_budget.py --latency 80 --bandwidth 1500
+    python verification/bundle_budget.py --record             # accept as the new baseline
+    python verification/bundle_budget.py --record --derive-budgets 0.1  # limits = baseline + 10%
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import re
+import statistics
+import sys
+from collections import defaultdict
+
+from playwright.sync_api import sync_playwright
+
+from harness import REPO_ROOT, VIEWPORT, dist_server, launch_browser
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR = os.path.join(REPO_ROOT, "dist")
+MANIFEST_PATH = os.path.join(".vite", "manifest.json")
+BUDGET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bundle_budget.json")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bundle_baseline.json")
+
+FIRST_FRAME_MARK = "neuroweaver:first-frame"
+METRICS = ("raw", "gzip", "brotli")
+UNMAPPED = "(unmapped)"
+UNMAPPED_CHUNKS = "(unmapped chunks)"  # Whole chunks shipped without a sourcemap in a mapped build
+HASH_SUFFIX = re.compile(r"-[A-Za-z0-9_-]{8}(\.[A-Za-z0-9]+)$")  # Vite appends an 8 character content hash
+
+BASE64 = {c: i for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/")}
+
+
+# --- Sizes ---
+
+def compressed_sizes(data):
+    """Raw, gzip -9 and brotli q11 sizes (brotli is None without the module)."""
+    return {
+        "raw": len(data),
+        "gzip": len(gzip.compress(data, 9, mtime=0)),
+        "brotli": len(brotli.compress(data, quality=11)) if brotli else None,
+    }
+
+
+def add_sizes(total, sizes):
+    """Accumulates `sizes` into `total`; a metric missing from either stays None."""
+    for metric in METRICS:
+        current, value = total.get(metric, 0), sizes.get(metric)
+        total[metric] = None if current is None or value is None else current + value
+    return total
+
+
+# --- Sourcemaps ---
+
+def decode_vlq(segment):
+    """Decodes one base64 VLQ sourcemap segment into its integer fields."""
+    values, shift, value = [], 0, 0
+    for char in segment:
+        digit = BASE64[char]
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+        else:
+            values.append(-(value >> 1) if value & 1 else value >> 1)
+            shift, value = 0, 0
+    return values
+
+
+def parse_mappings(mappings):
+    """Yields, per generated line, a list of (column, source index or None)."""
+    source = 0
+    for line in mappings.split(";"):
+        column, segments = 0, []
+        for segment in filter(None, line.split(",")):
+            fields = decode_vlq(segment)
+            column += fields[0]
+            if len(fields) >= 4:
+                source += fields[1]
+                segments.append((column, source))
+            else:
+                segments.append((column, None))
+        yield segments
+
+
+def module_name(source, map_dir, source_root=""):
+    """Maps a sourcemap source to a repo-relative path (e.g. node_modules/onnxruntime-web/...)."""
+    if source.startswith("\0"):
+        # Rollup virtual modules such as \0vite/preload-helper.js
+        return source[1:]
+    path = os.path.normpath(os.path.join(map_dir, source_root, source))
+    rel = os.path.relpath(path, REPO_ROOT)
+    return rel.replace(os.sep, "/")
+
+
+def package_of(module):
+    """Groups modules by npm package; everything else is app code."""
+    if module.startswith("chunk:"):
+        # Could be app code, dependencies or both; do not let it inflate "app"
+        return UNMAPPED_CHUNKS
+    parts = module.split("/")
+    if "node_modules" in parts:
+        i = len(parts) - 1 - parts[::-1].index("node_modules")
+        name = parts[i + 1:i + 3] if parts[i + 1].startswith("@") else parts[i + 1:i + 2]
+        return "/".join(name)
+    return UNMAPPED if module == UNMAPPED else "app"
+
+
+def attribute_chunk(code, source_map, map_dir):
+    """Splits generated code into {module: bytes} using the chunk's sourcemap."""
+    sources = [module_name(s, map_dir, source_map.get("sourceRoot") or "") for s in source_map.get("sources", [])]
+    mapped_lines = list(parse_mappings(source_map.get("mappings", "")))
+    pieces = defaultdict(list)
+    for line_no, line in enumerate(code.split("\n")):
+        segments = mapped_lines[line_no] if line_no < len(mapped_lines) else []
+        # Text before the first mapping on a line and the newlines themselves are unmapped
+        first = segments[0][0] if segments else len(line)
+        pieces[UNMAPPED].append(line[:first] + ("\n" if line_no else ""))
+        for i, (column, source) in enumerate(segments):
+            end = segments[i + 1][0] if i + 1 < len(segments) else len(line)
+            pieces[sources[source] if source is not None else UNMAPPED].append(line[column:end])
+    return {module: "".join(text).encode("utf-8") for module, text in pieces.items() if text}
+
+
+def split_compressed(chunk_sizes, module_bytes):
+    """Per-module sizes whose compressed columns sum to the chunk's real compressed size."""
+    standalone = {module: compressed_sizes(data) for module, data in module_bytes.items()}
+    result = {}
+    for module, sizes in standalone.items():
+        result[module] = {"raw": sizes["raw"]}
+        for metric in ("gzip", "brotli"):
+            total = sum(s[metric] for s in standalone.values() if s[metric] is not None)
+            if chunk_sizes[metric] is None or not total:
+                result[module][metric] = None
+            else:
+                result[module][metric] = round(chunk_sizes[metric] * sizes[metric] / total)
+    return result
+
+
+# --- Build analysis ---
+
+def load_manifest(dist):
+    path = os.path.join(dist, MANIFEST_PATH)
+    if not os.path.exists(path):
+        sys.exit(f"❌ {path} not found. Run 'npm run build' (build.manifest is enabled in vite.config.js).")
+    with open(path) as f:
+        return json.load(f)
+
+
+def initial_files(manifest):
+    """Files loaded before main.js runs: entry chunks, their static imports and CSS."""
+    files, stack = set(), [key for key, chunk in manifest.items() if chunk.get("isEntry")]
+    seen = set()
+    while stack:
+        key = stack.pop()
+        if key in seen or key not in manifest:
+            continue
+        seen.add(key)
+        chunk = manifest[key]
+        files.add(chunk["file"])
+        files.update(chunk.get("css", []))
+        stack.extend(chunk.get("imports", []))
+    return files
+
+
+def source_of_unlisted(rel):
+    """Names files the manifest has no source for, stable across builds."""
+    if rel.startswith("assets/"):
+        # Emitted assets (CSS, imported wasm...) without their content hash
+        return HASH_SUFFIX.sub(r"\1", rel)
+    # Everything else was copied from public/
+    return rel if rel == "index.html" else f"public/{rel}"
+
+
+def analyze(dist):
+    """Returns {files, modules, packages, assets, totals, attribution} for the build in `dist`."""
+    manifest = load_manifest(dist)
+    sources = {chunk["file"]: chunk.get("src", key) for key, chunk in manifest.items()}
+    initial = initial_files(manifest) | {"index.html"}
+
+    files, modules, assets = {}, {}, {}
+    mapped_chunks = 0
+    totals = {"total": {}, "initial": {}, "js": {}, "assets": {}}
+    for directory, dirnames, filenames in os.walk(dist):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in sorted(filenames):
+            path = os.path.join(directory, name)
+            rel = os.path.relpath(path, dist).replace(os.sep, "/")
+            # Skip maps and precompressed variants written by serve_dist.py
+            if name.endswith((".map", ".br", ".gz")):
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            sizes = compressed_sizes(data)
+            is_js = name.endswith((".js", ".mjs"))
+            source = sources.get(rel) or source_of_unlisted(rel)
+            files[rel] = {"source": source, "initial": rel in initial, **sizes}
+
+            add_sizes(totals["total"], sizes)
+            add_sizes(totals["js" if is_js else "assets"], sizes)
+            if rel in initial:
+                add_sizes(totals["initial"], sizes)
+
+            if not is_js:
+                assets[source] = add_sizes(assets.get(source, {}), sizes)
+                continue
+            map_path = path + ".map"
+            if os.path.exists(map_path):
+                mapped_chunks += 1
+                with open(map_path) as f:
+                    source_map = json.load(f)
+                parts = attribute_chunk(data.decode("utf-8"), source_map, os.path.dirname(map_path))
+                for module, module_sizes in split_compressed(sizes, parts).items():
+                    modules[module] = add_sizes(modules.get(module, {}), module_sizes)
+            else:
+                # Whole chunk under its hash-stripped output name, never mistaken for a module
+                chunk = f"chunk:{source_of_unlisted(rel)}"
+                modules[chunk] = add_sizes(modules.get(chunk, {}), sizes)
+
+    # Without sourcemaps there is nothing to group: every chunk would look like app code
+    attribution = "sourcemap" if mapped_chunks else "chunk"
+    packages = {}
+    if attribution == "sourcemap":
+        for module, sizes in modules.items():
+            package = package_of(module)
+            packages[package] = add_sizes(packages.get(package, {}), sizes)
+    return {"attribution": attribution, "files": files, "modules": modules, "packages": packages,
+            "assets": assets, "totals": totals}
+
+
+# --- Startup ---
+
+def measure_ttff(runs, latency_ms, bandwidth_kbps):
+    """Cold-cache loads of the production build; returns median startup timings (ms)."""
+    samples = []
+    with dist_server(latency_ms=latency_ms, bandwidth_kbps=bandwidth_kbps) as url, sync_playwright() as p:
+        browser = launch_browser(p)
+        try:
+            for _ in range(runs):
+                # Fresh context per run so nothing is served from the HTTP cache
+                context = browser.new_context(viewport=VIEWPORT)
+                page = context.new_page()
+                page.on("pageerror", lambda err: print(f"Browser Error: {err}"))
+                page.goto(url)
+                page.wait_for_function(f"() => performance.getEntriesByName('{FIRST_FRAME_MARK}').length > 0", timeout=120000)
+                samples.append(page.evaluate(f"""() => {{
+                    const ttff = performance.getEntriesByName('{FIRST_FRAME_MARK}')[0].startTime;
+                    const nav = performance.getEntriesByType('navigation')[0];
+                    const loaded = performance.getEntriesByType('resource').filter(r => r.responseEnd <= ttff);
+                    return {{
+                        ttffMs: ttff,
+                        domContentLoadedMs: nav.domContentLoadedEventEnd,
+                        requests: loaded.length + 1,
+                        transferBytes: loaded.reduce((sum, r) => sum + r.transferSize, nav.transferSize)
+                    }};
+                }}"""))
+                context.close()
+        finally:
+            browser.close()
+    return {key: statistics.median(s[key] for s in samples) for key in samples[0]}
+
+
+# --- Budgets & diff ---
+
+BUDGET_SECTIONS = ("totals", "packages", "modules", "assets")
+
+
+def check_budgets(report, budgets, baseline):
+    """Returns a list of human-readable budget violations; unevaluable budgets are violations too."""
+    failures = []
+
+    def check(label, sizes, limits):
+        for metric, limit in limits.items():
+            value = sizes.get(metric) if sizes else None
+            if value is None:
+                reason = "not in this build" if not sizes else "brotli module not installed" if metric == "brotli" else "not measured"
+                failures.append(f"{label} {metric} budget cannot be evaluated ({reason})")
+            elif value > limit:
+                failures.append(f"{label} {metric} {value:,} B > budget {limit:,} B")
+
+    for section in BUDGET_SECTIONS:
+        for name, limits in budgets.get(section, {}).items():
+            check(f"{section[:-1]}[{name}]", report[section].get(name), limits)
+
+    startup = report.get("startup")
+    if "ttffMs" in budgets and startup and startup["ttffMs"] > budgets["ttffMs"]:
+        failures.append(f"time-to-first-frame {startup['ttffMs']:.0f} ms > budget {budgets['ttffMs']:.0f} ms")
+
+    # Relative growth against the last recorded build catches creep below the absolute budgets
+    max_growth = budgets.get("maxGrowth")
+    if baseline and max_growth is not None:
+        for section in ("totals", "packages", "assets"):
+            for name, sizes in report[section].items():
+                before = baseline.get(section, {}).get(name, {}).get("gzip")
+                after = sizes.get("gzip")
+                if before and after and after > before * (1 + max_growth):
+                    failures.append(f"{section[:-1]}[{name}] gzip grew {after / before - 1:+.1%} "
+                                    f"({before:,} -> {after:,} B, max {max_growth:+.0%})")
+    return failures
+
+
+def derive_budgets(baseline, headroom, max_growth):
+    """Budget limits at `headroom` above a recorded build (gzip sizes, TTFF if measured)."""
+    def limit(sizes):
+        return {"gzip": math.ceil(sizes["gzip"] * (1 + headroom))}
+
+    budgets = {
+        "maxGrowth": max_growth,
+        "totals": {name: limit(sizes) for name, sizes in baseline["totals"].items() if sizes.get("gzip")},
+        "assets": {name: limit(sizes) for name, sizes in baseline["assets"].items() if sizes.get("gzip")},
+    }
+    if baseline.get("attribution") == "sourcemap":
+        budgets["packages"] = {name: limit(sizes) for name, sizes in baseline["packages"].items() if sizes.get("gzip")}
+        # App modules only; dependency internals are covered by their package
+        budgets["modules"] = {name: limit(sizes) for name, sizes in baseline["modules"].items()
+                              if sizes.get("gzip") and package_of(name) == "app"}
+    if baseline.get("startup"):
+        budgets["ttffMs"] = math.ceil(baseline["startup"]["ttffMs"] * (1 + headroom))
+    return budgets
+
+
+def format_bytes(value):
+    if value is None:
+        return "-"
+    if abs(value) < 1024:
+        return f"{value:.0f} B"
+    if abs(value) < 1024 * 1024:
+        return f"{value / 1024:.1f} KB"
+    return f"{value / (1024 * 1024):.2f} MB"
+
+
+def print_table(title, rows, limit=None):
+    print(f"\n{title}")
+    print(f"  {'name':<58} {'raw':>10} {'gzip':>10} {'brotli':>10}")
+    ordered = sorted(rows.items(), key=lambda item: item[1].get("raw") or 0, reverse=True)
+    for name, sizes in ordered[:limit]:
+        print(f"  {name[-58:]:<58} {format_bytes(sizes.get('raw')):>10} {format_bytes(sizes.get('gzip')):>10} "
+              f"{format_bytes(sizes.get('brotli')):>10}")
+    if limit and len(ordered) > limit:
+        print(f"  ... {len(ordered) - limit} more")
+
+
+def print_diff(baseline, report, threshold=256):
+    """Prints gzip size changes per total/package/module versus the recorded build."""
+    print("\nChanges since last recorded build (gzip):")
+    changed = False
+    for section in ("totals", "packages", "assets", "modules"):
+        names = set(baseline.get(section, {})) | set(report[section])
+        for name in sorted(names):
+            before = baseline.get(section, {}).get(name, {}).get("gzip") or 0
+            after = report[section].get(name, {}).get("gzip") or 0
+            if abs(after - before) >= threshold:
+                changed = True
+                tag = "🆕" if not before else "🗑️" if not after else "📈" if after > before else "📉"
+                print(f"  {tag} {section[:-1]}[{name}] {format_bytes(before)} -> {format_bytes(after)} ({after - before:+,} B)")
+    old, new = baseline.get("startup"), report.get("startup")
+    if old and new:
+        changed = True
+        print(f"  ⏱️ time-to-first-frame {old['ttffMs']:.0f} -> {new['ttffMs']:.0f} ms "
+              f"({new['ttffMs'] - old['ttffMs']:+.0f} ms)")
+    if not changed:
+        print("  (no significant changes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check bundle size and startup time against budgets.")
+    parser.add_argument("--dist", default=DIST_DIR)
+    parser.add_argument("--budget", default=BUDGET_PATH)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--record", action="store_true", help="Save this build as the baseline for future diffs")
+    parser.add_argument("--force", action="store_true", help="Record even when budgets are violated")
+    parser.add_argument("--derive-budgets", type=float, metavar="HEADROOM",
+                        help="Rewrite the budget file from the baseline plus this headroom (e.g. 0.1)")
+    parser.add_argument("--skip-ttff", action="store_true", help="Only analyze sizes")
+    parser.add_argument("--runs", type=int, default=3, help="Cold loads for the startup median")
+    parser.add_argument("--latency", type=float, default=0, help="serve_dist.py latency per request (ms)")
+    parser.add_argument("--bandwidth", type=float, default=0, help="serve_dist.py bandwidth cap (KB/s)")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list")
+    parser.add_argument("--json", help="Write the full report to this file")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dist):
+        sys.exit(f"❌ {args.dist} not found. Run 'npm run build' first.")
+    if brotli is None:
+        print("⚠️ brotli module not installed, brotli sizes are skipped (pip install brotli)")
+
+    report = analyze(args.dist)
+    if not args.skip_ttff:
+        report["startup"] = measure_ttff(args.runs, args.latency, args.bandwidth)
+
+    print_table("Totals", report["totals"])
+    if report["attribution"] == "sourcemap":
+        print_table("Packages (JS)", report["packages"])
+    print_table(f"Modules (top {args.top})", report["modules"], args.top)
+    print_table(f"Assets (top {args.top})", report["assets"], args.top)
+    if "startup" in report:
+        s = report["startup"]
+        print(f"\nStartup (median of {args.runs}): first frame {s['ttffMs']:.0f} ms, "
+              f"DOMContentLoaded {s['domContentLoadedMs']:.0f} ms, {s['requests']:.0f} requests, "
+              f"{format_bytes(s['transferBytes'])} transferred")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print_diff(baseline, report)
+
+    with open(args.budget) as f:
+        budgets = json.load(f)
+    if report["attribution"] != "sourcemap" and (budgets.get("packages") or budgets.get("modules")):
+        sys.exit("❌ Package/module budgets need sourcemaps but dist/ has no .map files.\n"
+                 "   Rebuild with: npm run build -- --sourcemap hidden")
+    if args.skip_ttff and "ttffMs" in budgets:
+        print("⚠️ --skip-ttff: time-to-first-frame budget not checked")
+    failures = check_budgets(report, budgets, baseline)
+    if not any(budgets.get(section) for section in BUDGET_SECTIONS) and "ttffMs" not in budgets:
+        print(f"⚠️ No size budgets in {args.budget} yet: record a baseline and run --derive-budgets")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    if args.record:
+        if failures and not args.force:
+            print(f"⛔ Not recording {args.baseline}: this build violates its budgets (use --force to accept it)")
+        else:
+            with open(args.baseline, "w") as f:
+                json.dump(report, f, indent=2)
+            baseline = report
+            print(f"📌 Recorded baseline: {args.baseline}")
+    if args.derive_budgets is not None:
+        if baseline is None:
+            sys.exit("❌ --derive-budgets needs a recorded baseline (run with --record)")
+        if baseline.get("attribution") != "sourcemap":
+            print("⚠️ Baseline has no sourcemap attribution: package/module budgets are not derived")
+        derived = derive_budgets(baseline, args.derive_budgets, budgets.get("maxGrowth", 0.05))
+        with open(args.budget, "w") as f:
+            json.dump(derived, f, indent=2)
+            f.write("\n")
+        print(f"📐 Budgets derived from the baseline (+{args.derive_budgets:.0%}) -> {args.budget}")
+
+    if failures:
+        print(f"\n❌ {len(failures)} budget violation(s):")
+        for failure in failures:
+            print(f"   {failure}")
+        sys.exit(1)
+    print("\n✅ Within budget")
+
+
+if __name__ == "__main__":
+    main()
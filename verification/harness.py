@@ -0,0 +1,195 @@
+"""
+Shared Playwright helpers for the verification and tooling scripts.
+
+The harness installs a deterministic clock in the page before any app code
+runs: Math.random is seeded, performance.now only advances when frames are
+stepped, and requestAnimationFrame callbacks are queued until the harness
+releases them. Frames are therefore reproducible run to run and never wait
+on wall-clock time.
+"""
+import base64
+import os
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+
+APP_URL = "http://localhost:5173"
+DIST_PORT = 4173
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WEBGPU_ARGS = ["--enable-unsafe-webgpu", "--use-gl=swiftshader", "--no-sandbox"]
+VIEWPORT = {"width": 1280, "height": 720}
+DEFAULT_SEED = 1234
+FRAME_MS = 16.0  # Matches the renderer's default timeStep (0.016s)
+
+DETERMINISTIC_INIT_SCRIPT = """
+(() => {
+    // Seeded PRNG (mulberry32) so the circuit grid and random stimuli repeat
+    let seed = %(seed)d >>> 0;
+    Math.random = () => {
+        seed = (seed + 0x6D2B79F5) >>> 0;
+        let t = seed;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+
+    // Manual clock: animation frames only run when the harness steps them
+    const realNow = performance.now.bind(performance);
+    let now = 0;
+    let nextId = 1;
+    let pending = new Map();
+    performance.now = () => now;
+    window.requestAnimationFrame = (cb) => { const id = nextId++; pending.set(id, cb); return id; };
+    window.cancelAnimationFrame = (id) => { pending.delete(id); };
+
+    window.__nwClock = {
+        frameMs: %(frame_ms)f,
+        realNow, // Wall clock for benchmarks
+        get now() { return now; },
+        pending: () => pending.size,
+        async step(count, captureType = null) {
+            for (let i = 0; i < count; i++) {
+                now += this.frameMs;
+                const batch = pending;
+                pending = new Map();
+                batch.forEach(cb => cb(now));
+            }
+            // Read the canvas back in the same task as the last render so the
+            // WebGPU texture has not been presented (and invalidated) yet
+            const dataUrl = captureType ? document.getElementById('canvas').toDataURL(captureType) : null;
+            const renderer = window.neuroWeaver && window.neuroWeaver.renderer;
+            if (renderer) await renderer.device.queue.onSubmittedWorkDone();
+            return dataUrl;
+        }
+    };
+})();
+"""
+
+RESET_SCRIPT = """
+() => {
+    const { renderer, player } = window.neuroWeaver;
+    const defaults = window.__nwDefaults;
+    player.stop();
+    renderer.setParams(defaults.params);
+    renderer.rotation = { ...defaults.rotation };
+    renderer.targetRotation = { ...defaults.rotation };
+    renderer.zoom = defaults.zoom;
+    renderer.targetZoom = defaults.zoom;
+    renderer.time = 0;
+    renderer.resetActivity();
+    document.getElementById('style-mode').value = String(defaults.params.style);
+}
+"""
+
+
+def launch_browser(p, headless=True):
+    """Launches Chromium with the WebGPU flags used across the verification scripts."""
+    return p.chromium.launch(headless=headless, args=WEBGPU_ARGS)
+
+
+@contextmanager
+def dist_server(port=DIST_PORT, latency_ms=0, bandwidth_kbps=0, precompress=True):
+    """
+    Serves the production build (dist/) with serve_dist.py for the duration of
+    the block and yields its URL, so measurements see bundled, compressed,
+    cache-controlled assets instead of the Vite dev server.
+    """
+    cmd = [sys.executable, os.path.join(REPO_ROOT, "serve_dist.py"), "--root", os.path.join(REPO_ROOT, "dist"),
+           "--port", str(port), "--latency", str(latency_ms), "--bandwidth", str(bandwidth_kbps), "--quiet"]
+    if precompress:
+        cmd.append("--precompress")
+    proc = subprocess.Popen(cmd)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError("serve_dist.py exited early. Did you run 'npm run build' first?")
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"serve_dist.py did not start listening on port {port}")
+                time.sleep(0.1)
+        yield f"http://localhost:{port}"
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def open_app(browser, url=APP_URL, seed=DEFAULT_SEED, frame_ms=FRAME_MS, viewport=VIEWPORT, log_console=False):
+    """
+    Opens the app with the deterministic clock installed and waits until the
+    renderer is running. Returns the page.
+    """
+    context = browser.new_context(viewport=viewport)
+    context.add_init_script(DETERMINISTIC_INIT_SCRIPT % {"seed": seed, "frame_ms": frame_ms})
+    page = context.new_page()
+    if log_console:
+        page.on("console", lambda msg: print(f"Browser Console: {msg.text}"))
+    page.on("pageerror", lambda err: print(f"Browser Error: {err}"))
+
+    page.goto(url)
+    # Playwright polls on requestAnimationFrame by default, which the init script
+    # replaced with a queue nobody drains yet; poll on a timer instead
+    page.wait_for_function("() => window.neuroWeaver && window.neuroWeaver.renderer.isRunning", polling=100, timeout=30000)
+
+    # Keep simulation time in lockstep with the clock, then snapshot the
+    # startup state so scenarios can be reset without a reload
+    page.evaluate("""(frameMs) => {
+        const r = window.neuroWeaver.renderer;
+        r.timeStep = frameMs / 1000;
+        window.__nwDefaults = { params: { ...r.params }, rotation: { ...r.targetRotation }, zoom: r.targetZoom };
+    }""", frame_ms)
+    return page
+
+
+def reset_app(page):
+    """Restores the startup parameters, camera, clock and an empty activity volume."""
+    page.evaluate(RESET_SCRIPT)
+    step_frames(page, 1)
+
+
+def step_frames(page, count, batch=120):
+    """Advances the app by `count` fixed-timestep frames and waits for the GPU to finish."""
+    # Long runs are split so a single evaluate never queues minutes of GPU work
+    while count > 0:
+        n = min(count, batch)
+        page.evaluate("n => window.__nwClock.step(n)", n)
+        count -= n
+
+
+def fast_forward(page, count, batch=120):
+    """Advances `count` frames with the renderer's draw pass skipped (simulation only)."""
+    if count <= 0:
+        return
+    page.evaluate("() => { window.neuroWeaver.renderer.fastForward = true; }")
+    try:
+        step_frames(page, count, batch)
+    finally:
+        page.evaluate("() => { window.neuroWeaver.renderer.fastForward = false; }")
+
+
+def capture_canvas(page, count=1, mime="image/png"):
+    """Steps `count` frames and returns the encoded canvas contents of the last one."""
+    data_url = page.evaluate("([n, mime]) => window.__nwClock.step(n, mime)", [count, mime])
+    return base64.b64decode(data_url.split(",", 1)[1])
+
+
+def select_style(page, style):
+    """Switches the style dropdown, which also applies the UI style presets."""
+    page.select_option("#style-mode", str(style))
+
+
+def set_slider(page, element_id, value):
+    """Sets a range input and fires its input event like a user drag would."""
+    page.evaluate(
+        """([id, value]) => {
+            const el = document.getElementById(id);
+            el.value = value;
+            el.dispatchEvent(new Event('input'));
+        }""",
+        [element_id, str(value)],
+    )
@@ -0,0 +1,219 @@
+"""
+Visual regression suite for the Neuro-Weaver renderer.
+
+Renders a fixed set of style/stimulus scenarios under the deterministic
+harness clock, reads the canvas back and compares it against golden images
+in verification/golden/. Comparisons are NumPy-vectorized: per-channel mean
+error, the share of pixels whose worst channel exceeds a noise threshold,
+and a windowed SSIM on luminance. Failing scenarios write the capture and a
+diff heatmap to verification/diffs/.
+
+Usage:
+    python verification/visual_regression.py            # compare
+    python verification/visual_regression.py --update   # (re)write goldens
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image
+from playwright.sync_api import sync_playwright
+
+from harness import APP_URL, DEFAULT_SEED, capture_canvas, launch_browser, open_app, reset_app, select_style, set_slider, step_frames
+
+GOLDEN_DIR = "verification/golden"
+DIFF_DIR = "verification/diffs"
+
+# SwiftShader output drifts slightly between driver builds, so thresholds are
+# loose enough to absorb rasterization noise but catch visible changes.
+DEFAULT_TOLERANCE = {
+    "pixel_threshold": 24,   # Max per-pixel channel delta (0-255) treated as noise
+    "max_bad_ratio": 0.005,  # Share of pixels allowed above pixel_threshold
+    "min_ssim": 0.97,
+}
+
+# Each scenario is rendered from a reset state: style -> optional clip ->
+# optional stimulus -> `frames` steps -> canvas capture.
+# `mask` lists [x, y, w, h] canvas rectangles excluded from comparison.
+SCENARIOS = [
+    {"name": "organic_idle", "style": 0, "frames": 30},
+    {"name": "cyber_idle", "style": 1, "frames": 30},
+    {"name": "connectome_frontal", "style": 2, "stimulus": "stim-frontal", "frames": 30},
+    {"name": "connectome_serotonin", "style": 2, "stimulus": "stim-deep", "shift": 1.0, "frames": 30},
+    {"name": "heatmap_frontal", "style": 3, "stimulus": "stim-frontal", "frames": 30},
+    {"name": "heatmap_occipital", "style": 3, "stimulus": "stim-occipital", "frames": 30},
+    {"name": "heatmap_clipped", "style": 3, "stimulus": "stim-deep", "clip": 0.0, "frames": 30},
+]
+
+
+def decode_png(data):
+    """Decodes encoded image bytes into an HxWx3 uint8 array."""
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
+
+
+def load_golden(path):
+    """Loads a golden image as an HxWx3 uint8 array."""
+    return np.asarray(Image.open(path).convert("RGB"))
+
+
+def build_mask(shape, rects):
+    """Boolean HxW mask, False inside any of the excluded rectangles."""
+    mask = np.ones(shape[:2], dtype=bool)
+    for x, y, w, h in rects:
+        mask[y:y + h, x:x + w] = False
+    return mask
+
+
+def _box_mean(image, radius):
+    """Mean over a (2r+1)^2 window using an integral image (edge padded)."""
+    k = 2 * radius + 1
+    padded = np.pad(image, radius, mode="edge")
+    integral = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=np.float64)
+    integral[1:, 1:] = padded.cumsum(axis=0).cumsum(axis=1)
+    window = integral[k:, k:] - integral[:-k, k:] - integral[k:, :-k] + integral[:-k, :-k]
+    return window / (k * k)
+
+
+def ssim_map(a, b, radius=3):
+    """Per-pixel SSIM of two float luminance images."""
+    c1 = (0.01 * 255) ** 2
+    c2 = (0.03 * 255) ** 2
+    mu_a = _box_mean(a, radius)
+    mu_b = _box_mean(b, radius)
+    var_a = _box_mean(a * a, radius) - mu_a * mu_a
+    var_b = _box_mean(b * b, radius) - mu_b * mu_b
+    cov = _box_mean(a * b, radius) - mu_a * mu_b
+    return ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+
+
+def luminance(image):
+    return image.astype(np.float64) @ np.array([0.299, 0.587, 0.114])
+
+
+def compare_images(golden, actual, mask=None, tolerance=None):
+    """
+    Compares two HxWx3 uint8 images and returns a metrics dict including the
+    per-pixel delta map used for the diff heatmap.
+    """
+    tol = {**DEFAULT_TOLERANCE, **(tolerance or {})}
+    if golden.shape != actual.shape:
+        return {"passed": False, "reason": f"size {actual.shape[1]}x{actual.shape[0]} != golden {golden.shape[1]}x{golden.shape[0]}"}
+    if mask is None:
+        mask = np.ones(golden.shape[:2], dtype=bool)
+
+    delta = np.abs(golden.astype(np.int16) - actual.astype(np.int16))
+    pixel_delta = delta.max(axis=2)
+    pixel_delta[~mask] = 0
+
+    valid = max(1, int(mask.sum()))
+    channel_mean = delta[mask].mean(axis=0) if mask.any() else np.zeros(3)
+    bad_ratio = float(np.count_nonzero(pixel_delta > tol["pixel_threshold"])) / valid
+    # Masked pixels take the golden's values so changes inside an excluded
+    # rectangle cannot leak into neighbouring SSIM windows
+    masked_actual = np.where(mask[..., None], actual, golden)
+    ssim = float(ssim_map(luminance(golden), luminance(masked_actual))[mask].mean()) if mask.any() else 1.0
+
+    reasons = []
+    if bad_ratio > tol["max_bad_ratio"]:
+        reasons.append(f"bad pixels {bad_ratio:.3%} > {tol['max_bad_ratio']:.3%}")
+    if ssim < tol["min_ssim"]:
+        reasons.append(f"SSIM {ssim:.4f} < {tol['min_ssim']}")
+
+    return {
+        "passed": not reasons,
+        "reason": ", ".join(reasons),
+        "channel_mean": [round(float(c), 3) for c in channel_mean],
+        "max_delta": int(pixel_delta.max()),
+        "bad_ratio": bad_ratio,
+        "ssim": ssim,
+        "pixel_delta": pixel_delta,
+    }
+
+
+def diff_heatmap(actual, pixel_delta):
+    """Overlays a black-red-yellow-white heat ramp of pixel_delta on a dimmed capture."""
+    d = np.clip(pixel_delta.astype(np.float32) / 64.0, 0.0, 1.0)
+    heat = np.stack([np.clip(d * 3.0, 0, 1), np.clip(d * 3.0 - 1.0, 0, 1), np.clip(d * 3.0 - 2.0, 0, 1)], axis=-1)
+    base = luminance(actual)[..., None] / 255.0 * 0.3
+    return (np.clip(base + heat, 0.0, 1.0) * 255).astype(np.uint8)
+
+
+def render_scenario(page, scenario):
+    """Drives the app into a scenario's state and returns the captured canvas bytes."""
+    reset_app(page)
+    select_style(page, scenario["style"])
+    if "clip" in scenario:
+        set_slider(page, "clip", scenario["clip"])
+    if "shift" in scenario:
+        set_slider(page, "shift", scenario["shift"])
+    step_frames(page, 5)
+    if "stimulus" in scenario:
+        page.click(f"#{scenario['stimulus']}")
+    return capture_canvas(page, scenario.get("frames", 30))
+
+
+def run_suite(url=APP_URL, seed=DEFAULT_SEED, update=False, only=None):
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    scenarios = [s for s in SCENARIOS if not only or s["name"] in only]
+    if not update:
+        # Refuse to run without goldens: an implicit first --update would bless
+        # whatever the current tree renders
+        missing = [s["name"] for s in scenarios if not os.path.exists(os.path.join(GOLDEN_DIR, f"{s['name']}.png"))]
+        if missing:
+            print(f"❌ No golden images in {GOLDEN_DIR} for: {', '.join(missing)}")
+            print("   Render them from a known-good revision with --update and commit them.")
+            sys.exit(2)
+    failures = 0
+    start = time.perf_counter()
+
+    with sync_playwright() as p:
+        browser = launch_browser(p)
+        try:
+            page = open_app(browser, url=url, seed=seed)
+            for scenario in scenarios:
+                name = scenario["name"]
+                golden_path = os.path.join(GOLDEN_DIR, f"{name}.png")
+                data = render_scenario(page, scenario)
+
+                if update:
+                    with open(golden_path, "wb") as f:
+                        f.write(data)
+                    print(f"📝 {name}: golden updated")
+                    continue
+
+                golden = load_golden(golden_path)
+                actual = decode_png(data)
+                mask = build_mask(actual.shape, scenario.get("mask", []))
+                result = compare_images(golden, actual, mask, scenario.get("tolerance"))
+                if result["passed"]:
+                    print(f"✅ {name}: SSIM {result['ssim']:.4f}, bad {result['bad_ratio']:.3%}, max Δ {result['max_delta']}")
+                    continue
+
+                failures += 1
+                print(f"❌ {name}: {result['reason']}")
+                if "pixel_delta" in result:
+                    os.makedirs(DIFF_DIR, exist_ok=True)
+                    Image.fromarray(actual).save(os.path.join(DIFF_DIR, f"{name}_actual.png"))
+                    Image.fromarray(diff_heatmap(actual, result["pixel_delta"])).save(os.path.join(DIFF_DIR, f"{name}_diff.png"))
+        finally:
+            browser.close()
+
+    print(f"{len(scenarios) - failures}/{len(scenarios)} scenarios passed in {time.perf_counter() - start:.1f}s")
+    return failures == 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare renderer captures against golden images.")
+    parser.add_argument("--url", default=APP_URL)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--update", action="store_true", help="Write captures as the new goldens")
+    parser.add_argument("--only", nargs="*", help="Scenario names to run")
+    args = parser.parse_args()
+    sys.exit(0 if run_suite(args.url, args.seed, args.update, args.only) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,10 @@ export default defineConfig({
       'Cross-Origin-Embedder-Policy': 'require-corp',
     }
   },
+  build: {
+    // dist/.vite/manifest.json maps hashed output back to sources (verification/bundle_budget.py)
+    manifest: true
+  },
   optimizeDeps: {
     exclude: ['onnxruntime-web']
   }